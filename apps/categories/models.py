@@ -2,6 +2,7 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from myproject.apps.core.model_fields import TranslatedField
 from myproject.apps.core.model_fields import MultilingualCharField
+from myproject.apps.core.models import TranslatedQuerySet
 
 
 class Category(models.Model):
@@ -12,6 +13,8 @@ class Category(models.Model):
     title = models.CharField(_("Title"), max_length=200)
 
     translated_title = TranslatedField("title")
+
+    objects = TranslatedQuerySet.as_manager()
 	
     class Meta:
         verbose_name = _("Category")
@@ -83,11 +83,22 @@ class TranslatedField(object):
         self.field_name = field_name
 
     def __get__(self, instance, owner):
+        if instance is None:
+            return self
         lang_code = translation.get_language()
         if lang_code == settings.LANGUAGE_CODE:
             return getattr(instance, self.field_name)
+        prefetched = getattr(instance, "_prefetched_objects_cache", {})
+        if "translations" in prefetched:
+            # use the translations loaded by with_translations()
+            # instead of querying them for every instance
+            translations = next(
+                (obj for obj in prefetched["translations"]
+                 if obj.language == lang_code),
+                instance,
+            )
         else:
             translations = instance.translations.filter(
                 language=lang_code,
             ).first() or instance
-            return getattr(translations, self.field_name)
\ No newline at end of file
+        return getattr(translations, self.field_name)
@@ -2,6 +2,7 @@ from urllib.parse import urlparse, urlunparse
 from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from django.utils.translation import get_language
 from django.utils.safestring import mark_safe
 from django.template.loader import render_to_string
 from django.contrib.contenttypes.models import ContentType
@@ -9,31 +10,45 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.core.exceptions import FieldError
 
 
+def get_translations_prefetch(model, language=None):
+    language = language or get_language() or settings.LANGUAGE_CODE
+    if language == settings.LANGUAGE_CODE:
+        return None
+    translations_model = model._meta.get_field("translations").related_model
+    return models.Prefetch(
+        "translations",
+        queryset=translations_model.objects.filter(language=language),
+    )
+
+
+class TranslatedQuerySet(models.QuerySet):
+    """
+    QuerySet for models with a "translations" reverse relation
+    that is read by TranslatedField
+    """
+
+    def with_translations(self, language=None):
+        prefetch = get_translations_prefetch(self.model, language)
+        if prefetch is None:
+            return self
+        return self.prefetch_related(prefetch)
+
+
 class UrlBase(models.Model):
 
     class Meta:
         abstract = True
 
     def get_url(self):
-        if hasattr(self.get_url_path, "dont_recurse"):
+        if type(self).get_url_path is UrlBase.get_url_path:
             raise NotImplementedError
-        try:
-            path = self.get_url_path()
-        except NotImplementedError:
-            raise
-        return settings.WEBSITE_URL + path
-    get_url.dont_recurse = True
+        return settings.WEBSITE_URL + self.get_url_path()
 
     def get_url_path(self):
-        if hasattr(self.get_url, "dont_recurse"):
+        if type(self).get_url is UrlBase.get_url:
             raise NotImplementedError
-        try:
-            url = self.get_url()
-        except NotImplementedError:
-            raise
-        bits = urlparse(url)
+        bits = urlparse(self.get_url())
         return urlunparse(("", "") + bits[2:])
-    get_url_path.dont_recurse = True
 
     def get_absolute_url(self):
         return self.get_url()
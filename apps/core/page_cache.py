@@ -0,0 +1,147 @@
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.translation import get_language
+
+PAGE_CACHE_ALIAS = getattr(settings, "PAGE_CACHE_ALIAS", "default")
+PAGE_CACHE_TIMEOUT = getattr(settings, "PAGE_CACHE_TIMEOUT", 60 * 15)
+
+
+def get_page_cache():
+    return caches[PAGE_CACHE_ALIAS]
+
+
+def get_canonical_query_string(query_dict):
+    # ?rating=3&author=1 and ?author=1&rating=3 are the same page
+    return urlencode(
+        [(key, value) for key, values in sorted(query_dict.lists()) for value in values]
+    )
+
+
+def get_page_cache_key(request):
+    language = get_language() or settings.LANGUAGE_CODE
+    url = f"{request.path}?{get_canonical_query_string(request.GET)}"
+    url_hash = hashlib.md5(url.encode("utf-8")).hexdigest()
+    return f"page:{language}:{url_hash}"
+
+
+def get_tag_key(tag):
+    return f"page_tag:{tag}"
+
+
+def get_tag_versions(tags):
+    cache = get_page_cache()
+    keys = {get_tag_key(tag): tag for tag in tags}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+    for key, tag in keys.items():
+        if tag not in versions:
+            version = time.time_ns()
+            cache.add(key, version, timeout=None)
+            versions[tag] = cache.get(key, version)
+    return versions
+
+
+def invalidate_tags(*tags):
+    cache = get_page_cache()
+    for tag in tags:
+        key = get_tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # the version was evicted; any new value differs from the stored ones
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_cached_response(key):
+    cache = get_page_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if get_tag_versions(entry["tags"]) != entry["tags"]:
+        return None
+    response = HttpResponse(entry["content"], status=entry["status"])
+    for header, value in entry["headers"]:
+        response[header] = value
+    return response
+
+
+def store_response(key, response, tag_versions):
+    get_page_cache().set(
+        key,
+        {
+            "content": response.content,
+            "status": response.status_code,
+            "headers": list(response.items()),
+            "tags": tag_versions,
+        },
+        PAGE_CACHE_TIMEOUT,
+    )
+
+
+def is_cacheable_request(request):
+    return request.method in ("GET", "HEAD") and not request.user.is_authenticated
+
+
+def is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_USED")
+    )
+
+
+def record_tag_versions(request, tags):
+    """
+    Adds tags which are only known once the view has loaded its data,
+    e.g. the categories of an idea. Call it right after loading, so that
+    a change during rendering expires the page.
+    """
+    versions = getattr(request, "_page_cache_tag_versions", None)
+    if versions is None:
+        return
+    missing = [tag for tag in tags if tag not in versions]
+    if missing:
+        versions.update(get_tag_versions(missing))
+
+
+def cache_page_with_tags(get_tags):
+    """
+    Caches the pages of a view for anonymous visitors per language and
+    query string. get_tags(request, *args, **kwargs) returns the
+    dependency tags of a page; their versions are read before the view
+    runs, so a change during rendering doesn't get stamped with the new
+    version. invalidate_tags() expires all pages that depend on a tag.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not is_cacheable_request(request):
+                return view_func(request, *args, **kwargs)
+            key = get_page_cache_key(request)
+            response = get_cached_response(key)
+            if response is not None:
+                return response
+            tag_versions = get_tag_versions(get_tags(request, *args, **kwargs))
+            request._page_cache_tag_versions = tag_versions
+            response = view_func(request, *args, **kwargs)
+
+            def store(response):
+                if is_cacheable_response(request, response):
+                    store_response(key, response, tag_versions)
+
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+
+        return _wrapped_view
+
+    return decorator
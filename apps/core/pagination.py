@@ -0,0 +1,292 @@
+import base64
+import binascii
+import json
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values):
+    data = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        data = base64.urlsafe_b64decode(cursor + padding)
+        values = json.loads(data.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursor(cursor)
+    if not isinstance(values, list) or len(values) < 2:
+        raise InvalidCursor(cursor)
+    return values
+
+
+class KeysetPage:
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by the values of its ordering fields
+    instead of COUNT(*) and OFFSET, so that every page costs the same.
+    The last ordering field has to be unique and none of them nullable.
+    """
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, queryset, per_page, ordering=("pk",)):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def get_cursor(self, direction, obj):
+        values = [str(attrgetter(field)(obj)) for field in self.ordering]
+        return encode_cursor([direction] + values)
+
+    def clean_values(self, values):
+        # the values come from the request; a value which the field can't
+        # take would make the query fail
+        opts = self.queryset.model._meta
+        cleaned_values = []
+        for field_name, value in zip(self.ordering, values):
+            field = opts.pk if field_name == "pk" else opts.get_field(field_name)
+            if not isinstance(value, str):
+                raise InvalidCursor(value)
+            try:
+                cleaned_values.append(field.to_python(value))
+            except ValidationError:
+                raise InvalidCursor(value)
+        return cleaned_values
+
+    def get_keyset_filter(self, values, lookup):
+        # (a, b) > (x, y)  =>  a > x OR (a = x AND b > y)
+        condition = models.Q()
+        for index, field in enumerate(self.ordering):
+            equal = {f: v for f, v in zip(self.ordering[:index], values)}
+            equal[f"{field}__{lookup}"] = values[index]
+            condition |= models.Q(**equal)
+        return condition
+
+    def page(self, cursor=None):
+        direction, values = self.NEXT, None
+        if cursor:
+            direction, *values = decode_cursor(cursor)
+            if (direction not in (self.NEXT, self.PREVIOUS)
+                    or len(values) != len(self.ordering)):
+                raise InvalidCursor(cursor)
+            values = self.clean_values(values)
+
+        qs = self.queryset
+        if direction == self.NEXT:
+            qs = qs.order_by(*self.ordering)
+            if values:
+                qs = qs.filter(self.get_keyset_filter(values, "gt"))
+        else:
+            qs = qs.order_by(*[f"-{field}" for field in self.ordering])
+            qs = qs.filter(self.get_keyset_filter(values, "lt"))
+
+        object_list = list(qs[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if direction == self.NEXT:
+            has_next, has_previous = has_more, values is not None
+        else:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.get_cursor(self.NEXT, object_list[-1])
+        if object_list and has_previous:
+            previous_cursor = self.get_cursor(self.PREVIOUS, object_list[0])
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
+
+
+def iterate_in_chunks(queryset, chunk_size):
+    """
+    Iterates over a queryset in chunks ordered by the primary key.
+    Unlike QuerySet.iterator(), this applies prefetch_related() to each
+    chunk and doesn't use OFFSET, so late chunks are as fast as the first.
+    """
+    queryset = queryset.order_by("pk")
+    last_pk = None
+    while True:
+        chunk_qs = queryset
+        if last_pk is not None:
+            chunk_qs = chunk_qs.filter(pk__gt=last_pk)
+        chunk = list(chunk_qs[:chunk_size])
+        if not chunk:
+            break
+        yield from chunk
+        last_pk = chunk[-1].pk
+
+
+class SearchPage:
+    """
+    A page of Elasticsearch hits which quacks like Django's Page for the
+    numbered pagination and adds next_cursor for search_after paging.
+    """
+    cursor_based = False
+
+    def __init__(self, object_list, number, paginator, next_cursor=None):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+
+    def __repr__(self):
+        return f"<SearchPage {self.number} of {self.paginator.num_pages}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.number < self.paginator.num_pages
+
+    def has_previous(self):
+        # search_after only goes forward; beyond the result window the
+        # previous page can't be reached by its number
+        return 1 < self.number <= self.paginator.last_reachable_page + 1
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class SearchPaginator:
+    """
+    Paginates an elasticsearch_dsl search getting the hits and the total
+    in a single request. Numbered pages use from/size; the next page
+    cursor continues with search_after, so that deep pages are as cheap as
+    the first one. The last sort field has to be a unique keyword.
+    """
+
+    def __init__(self, search, per_page, sort=("_score", "uuid"),
+                 max_result_window=10000):
+        self.search = search
+        self.per_page = int(per_page)
+        self.sort = tuple(sort)
+        self.max_result_window = max_result_window
+        self.count = 0
+
+    @property
+    def num_pages(self):
+        return max(1, -(-self.count // self.per_page))
+
+    @property
+    def last_reachable_page(self):
+        # the last page which from/size can fetch
+        return max(1, self.max_result_window // self.per_page)
+
+    @property
+    def page_range(self):
+        return range(1, min(self.num_pages, self.last_reachable_page) + 1)
+
+    def get_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        return min(max(number, 1), self.last_reachable_page)
+
+    def is_valid_search_after(self, search_after):
+        if len(search_after) != len(self.sort):
+            return False
+        for field, value in zip(self.sort, search_after):
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                return False
+            if field == "_score" and isinstance(value, str):
+                return False
+        return True
+
+    def execute(self, number, search_after=None):
+        search = self.search.sort(*self.sort).extra(
+            size=self.per_page, track_total_hits=True
+        )
+        if search_after is not None:
+            search = search.extra(search_after=search_after)
+        else:
+            search = search.extra(from_=(number - 1) * self.per_page)
+        response = search.execute()
+        total = response.hits.total
+        # Elasticsearch 7 returns {"value": ..., "relation": ...}
+        self.count = getattr(total, "value", total)
+        return list(response)
+
+    def page(self, number=None, cursor=None):
+        from elasticsearch.exceptions import RequestError
+
+        search_after = None
+        if cursor:
+            number, *search_after = decode_cursor(cursor)
+            if (isinstance(number, bool) or not isinstance(number, int)
+                    or number < 1 or not self.is_valid_search_after(search_after)):
+                raise InvalidCursor(cursor)
+        else:
+            # only cursor pages may go beyond the result window
+            number = self.get_number(number)
+
+        try:
+            object_list = self.execute(number, search_after)
+        except RequestError:
+            if search_after is None:
+                raise
+            # e.g. a string for a numeric sort field
+            raise InvalidCursor(cursor)
+        if not object_list and number > self.num_pages:
+            # out of range; the total is known now, so show the last page
+            number = self.get_number(self.num_pages)
+            object_list = self.execute(number)
+
+        page = SearchPage(object_list, number, self)
+        if object_list and page.has_next():
+            page.next_cursor = encode_cursor(
+                [number + 1] + list(object_list[-1].meta.sort)
+            )
+        return page
@@ -0,0 +1,51 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_process_pools = {}
+_lock = threading.Lock()
+
+
+def get_process_pool(name, max_workers=None, initializer=None, initargs=()):
+    """
+    Returns a named process pool that is created on first use and kept
+    for the lifetime of the web worker. The workers are spawned, not
+    forked, so they don't share database connections with the parent.
+    Functions submitted to them must not import Django models at
+    module level unless the initializer sets Django up.
+    """
+    with _lock:
+        pool = _process_pools.get(name)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs,
+            )
+            _process_pools[name] = pool
+        return pool
+
+
+def init_django_worker():
+    # spawned workers start with a fresh interpreter
+    import django
+
+    django.setup()
+
+
+def discard_process_pool(name):
+    with _lock:
+        pool = _process_pools.pop(name, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+@atexit.register
+def shutdown_process_pools():
+    with _lock:
+        pools = list(_process_pools.values())
+        _process_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False)
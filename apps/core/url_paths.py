@@ -0,0 +1,36 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import reverse
+from django.utils import translation
+
+
+@lru_cache(maxsize=None)
+def get_url_path_format(viewname, language, kwarg, placeholder):
+    """
+    Reverses the URL once per view and language with a placeholder and
+    returns the parts around it, including the i18n_patterns prefix
+    """
+    with translation.override(language):
+        path = reverse(viewname, kwargs={kwarg: placeholder})
+    prefix, suffix = path.split(str(placeholder), 1)
+    return prefix, suffix
+
+
+def get_url_path(viewname, value, language=None, kwarg="pk", placeholder="0"):
+    """
+    Returns the URL path of a view with a single keyword argument
+    for any language without activating it or calling reverse().
+    The placeholder has to be accepted by the URL's path converter.
+    """
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    prefix, suffix = get_url_path_format(viewname, language, kwarg, placeholder)
+    return f"{prefix}{value}{suffix}"
+
+
+@receiver(setting_changed)
+def clear_url_path_formats(setting, **kwargs):
+    if setting in ("ROOT_URLCONF", "LANGUAGES", "LANGUAGE_CODE"):
+        get_url_path_format.cache_clear()
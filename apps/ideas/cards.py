@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from myproject.apps.core.models import get_translations_prefetch
+from .derivative_registry import prefetch_picture_derivatives
+from .image_derivatives import get_all_picture_specs
+from .models import Idea
+
+CARD_CACHE_ALIAS = getattr(settings, "IDEAS_CARD_CACHE_ALIAS", "default")
+CARD_CACHE_TIMEOUT = getattr(settings, "IDEAS_CARD_CACHE_TIMEOUT", 60 * 60 * 24)
+CARD_TEMPLATE = "ideas/includes/idea_card.html"
+
+
+def get_card_cache_key(producer, uuid, language, modified):
+    # ideas and search hits render different cards for the same idea
+    return f"idea_card:{producer}:{uuid}:{language}:{modified.timestamp()}"
+
+
+def get_idea_card_context(idea):
+    return {
+        "url_path": idea.get_url_path(),
+        "thumbnail_url": idea.picture_derivatives["thumbnail"].url,
+        "thumbnail_sources": idea.picture_sources["thumbnail"],
+        "title": idea.translated_title,
+    }
+
+
+def get_document_card_context(document):
+    return {
+        "url_path": document.get_url_path(),
+        "thumbnail_url": document.picture_thumbnail_url,
+        "title": document.translated_title,
+    }
+
+
+def has_registered_thumbnails(obj):
+    # search hits carry a plain thumbnail URL only
+    if not isinstance(obj, Idea) or not obj.picture:
+        return True
+    return all(
+        derivative.exists
+        for name, derivative in obj.picture_derivatives.items()
+        if name.startswith("thumbnail")
+    )
+
+
+def render_idea_cards(objects, get_context=get_idea_card_context):
+    """
+    Returns the rendered cards of ideas or idea documents. The cards are
+    fetched from the cache in one request and only the missing ones are
+    rendered. As the idea's modification time is a part of the key,
+    changed ideas get new cards. Cards of pictures whose derivatives
+    aren't registered yet are not cached.
+    """
+    objects = list(objects)
+    language = get_language() or settings.LANGUAGE_CODE
+    keys = [
+        get_card_cache_key(get_context.__name__, obj.uuid, language, obj.modified)
+        for obj in objects
+    ]
+    cache = caches[CARD_CACHE_ALIAS]
+    cards = cache.get_many(keys)
+
+    missing = [(key, obj) for key, obj in zip(keys, objects) if key not in cards]
+    missing_ideas = [obj for key, obj in missing if isinstance(obj, Idea)]
+    prefetch = get_translations_prefetch(Idea, language)
+    if missing_ideas and prefetch is not None:
+        prefetch_related_objects(missing_ideas, prefetch)
+    prefetch_picture_derivatives(missing_ideas, get_all_picture_specs())
+
+    rendered_cards = {
+        key: render_to_string(CARD_TEMPLATE, get_context(obj))
+        for key, obj in missing
+    }
+    # cards without the generated derivatives lack their srcset, so they
+    # are rendered again until the derivatives are registered
+    cacheable_cards = {
+        key: rendered_cards[key]
+        for key, obj in missing
+        if has_registered_thumbnails(obj)
+    }
+    if cacheable_cards:
+        cache.set_many(cacheable_cards, CARD_CACHE_TIMEOUT)
+    cards.update(rendered_cards)
+    return [mark_safe(cards[key]) for key in keys]
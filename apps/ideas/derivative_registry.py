@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .image_derivatives import schedule_idea_derivatives
+from .models import IdeaPictureDerivative
+
+LOCAL_REGISTRY_TIMEOUT = getattr(settings, "IDEAS_DERIVATIVE_LOCAL_TIMEOUT", 60 * 5)
+LOCAL_REGISTRY_MAX_SIZE = getattr(settings, "IDEAS_DERIVATIVE_LOCAL_MAX_SIZE", 10000)
+# how long to wait before missing derivatives are generated again
+REGENERATION_DELAY = getattr(settings, "IDEAS_DERIVATIVE_REGENERATION_DELAY", 60 * 10)
+
+# in-process layer in front of the database table: {key: (expires, info)}
+_local_registry = {}
+_local_registry_lock = threading.Lock()
+
+
+class PictureDerivative:
+    """
+    Name, URL and dimensions of a generated derivative, looked up
+    without touching the storage. Derivatives which were not registered
+    yet fall back to imagekit's file name and have no dimensions.
+    """
+
+    def __init__(self, cache_file, info=None):
+        self.cache_file = cache_file
+        self.info = info
+
+    @property
+    def exists(self):
+        return self.info is not None
+
+    @property
+    def name(self):
+        if self.info:
+            return self.info["name"]
+        return self.cache_file.name
+
+    @property
+    def url(self):
+        return self.cache_file.storage.url(self.name)
+
+    @property
+    def width(self):
+        return self.info and self.info["width"]
+
+    @property
+    def height(self):
+        return self.info and self.info["height"]
+
+
+def _store_local(key, info, expires):
+    # must be called with the lock held
+    _local_registry.pop(key, None)
+    _local_registry[key] = (expires, info)
+    if len(_local_registry) > LOCAL_REGISTRY_MAX_SIZE:
+        now = time.monotonic()
+        for expired_key in [k for k, (e, i) in _local_registry.items() if e <= now]:
+            del _local_registry[expired_key]
+        # still full: drop the oldest entries, dicts keep the insertion order
+        while len(_local_registry) > LOCAL_REGISTRY_MAX_SIZE:
+            del _local_registry[next(iter(_local_registry))]
+
+
+def get_registry_key(source_name, spec_name):
+    source_hash = hashlib.md5(source_name.encode("utf-8")).hexdigest()
+    return f"derivative:{spec_name}:{source_hash}"
+
+
+def register_derivative(source_name, spec_name, cache_file):
+    info = {
+        "name": cache_file.name,
+        "width": cache_file.width,
+        "height": cache_file.height,
+    }
+    IdeaPictureDerivative.objects.update_or_create(
+        source_name=source_name, spec_name=spec_name, defaults=info
+    )
+    key = get_registry_key(source_name, spec_name)
+    with _local_registry_lock:
+        _store_local(key, info, time.monotonic() + LOCAL_REGISTRY_TIMEOUT)
+    return info
+
+
+def get_registered_derivatives(source_names, spec_names):
+    """
+    Returns {(source_name, spec_name): info} of the registered
+    derivatives, reading the ones not known to this process with one
+    query.
+    """
+    now = time.monotonic()
+    found = {}
+    missing_source_names = set()
+    with _local_registry_lock:
+        for source_name in source_names:
+            for spec_name in spec_names:
+                key = get_registry_key(source_name, spec_name)
+                entry = _local_registry.get(key)
+                if entry and entry[0] > now:
+                    found[(source_name, spec_name)] = entry[1]
+                else:
+                    if entry:
+                        del _local_registry[key]
+                    missing_source_names.add(source_name)
+    if missing_source_names:
+        rows = IdeaPictureDerivative.objects.filter(
+            source_name__in=missing_source_names, spec_name__in=spec_names
+        ).values_list("source_name", "spec_name", "name", "width", "height")
+        with _local_registry_lock:
+            for source_name, spec_name, name, width, height in rows:
+                info = {"name": name, "width": width, "height": height}
+                found[(source_name, spec_name)] = info
+                _store_local(
+                    get_registry_key(source_name, spec_name),
+                    info,
+                    now + LOCAL_REGISTRY_TIMEOUT,
+                )
+    return found
+
+
+def schedule_missing_derivatives(ideas):
+    """
+    Generates the derivatives of pictures which have unregistered ones,
+    e.g. because their generation failed, at most once per
+    REGENERATION_DELAY for each picture.
+    """
+    for idea in ideas:
+        source_hash = hashlib.md5(idea.picture.name.encode("utf-8")).hexdigest()
+        if cache.add(f"derivatives_scheduled:{source_hash}", True, REGENERATION_DELAY):
+            schedule_idea_derivatives(idea.pk)
+
+
+def prefetch_picture_derivatives(ideas, spec_names, schedule_missing=True):
+    """
+    Looks up the derivatives of several ideas with one query and stores
+    them as idea.picture_derivatives. Pictures with unregistered
+    derivatives are scheduled for generation unless schedule_missing
+    is False.
+    """
+    ideas = [idea for idea in ideas if "picture_derivatives" not in idea.__dict__]
+    source_names = {idea.picture.name for idea in ideas if idea.picture}
+    registered = get_registered_derivatives(source_names, spec_names)
+    incomplete_ideas = []
+    for idea in ideas:
+        derivatives = {
+            spec_name.replace("picture_", "", 1): PictureDerivative(
+                getattr(idea, spec_name),
+                registered.get((idea.picture.name, spec_name)),
+            )
+            for spec_name in spec_names
+        }
+        idea.__dict__["picture_derivatives"] = derivatives
+        if idea.picture and not all(d.exists for d in derivatives.values()):
+            incomplete_ideas.append(idea)
+    if schedule_missing and incomplete_ideas:
+        schedule_missing_derivatives(incomplete_ideas)
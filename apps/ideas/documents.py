@@ -1,5 +1,7 @@
+import itertools
+
 from django.conf import settings
-from django.utils.translation import get_language, activate
+from django.utils.translation import get_language
 from django.db import models
 
 from django_elasticsearch_dsl import fields
@@ -9,18 +11,35 @@ from django_elasticsearch_dsl.documents import (
 )
 from django_elasticsearch_dsl.registries import registry
 
-from myproject.apps.categories.models import Category
-from .models import Idea
+from myproject.apps.categories.models import Category, CategoryTranslations
+from myproject.apps.core.pagination import iterate_in_chunks
+from .derivative_registry import prefetch_picture_derivatives
+from .image_derivatives import get_all_picture_specs
+from .models import Idea, get_idea_url_path
 
-model_field_class_to_field_class[models.UUIDField] = fields.TextField
+# keyword, so that uuid can be the sort tiebreaker for search_after
+model_field_class_to_field_class[models.UUIDField] = fields.KeywordField
 
 
 def _get_url_path(instance, language):
-    current_language = get_language()
-    activate(language)
-    url_path = instance.get_url_path()
-    activate(current_language)
-    return url_path
+    return get_idea_url_path(instance.pk, language)
+
+
+def iterate_with_derivatives(ideas, chunk_size):
+    """
+    Yields the ideas, looking up the picture derivatives of each chunk
+    with one query instead of one per idea
+    """
+    ideas = iter(ideas)
+    while True:
+        chunk = list(itertools.islice(ideas, chunk_size))
+        if not chunk:
+            break
+        # the indexing commands shouldn't wait for generated pictures
+        prefetch_picture_derivatives(
+            chunk, get_all_picture_specs(), schedule_missing=False
+        )
+        yield from chunk
 
 
 @registry.register_document
@@ -83,7 +102,8 @@ class IdeaDocument(Document):
     content_es = fields.TextField()
     content_sv = fields.TextField()
 
-    picture_thumbnail_url = fields.TextField()
+    # stored for display only
+    picture_thumbnail_url = fields.KeywordField(index=False)
 
     categories = fields.NestedField(
         properties=dict(
@@ -116,30 +136,30 @@ class IdeaDocument(Document):
         include_in_root=True,
     )
 
-    url_path_bg = fields.TextField()
-    url_path_hr = fields.TextField()
-    url_path_cs = fields.TextField()
-    url_path_da = fields.TextField()
-    url_path_nl = fields.TextField()
-    url_path_en = fields.TextField()
-    url_path_et = fields.TextField()
-    url_path_fi = fields.TextField()
-    url_path_fr = fields.TextField()
-    url_path_de = fields.TextField()
-    url_path_el = fields.TextField()
-    url_path_hu = fields.TextField()
-    url_path_ga = fields.TextField()
-    url_path_it = fields.TextField()
-    url_path_lv = fields.TextField()
-    url_path_lt = fields.TextField()
-    url_path_mt = fields.TextField()
-    url_path_pl = fields.TextField()
-    url_path_pt = fields.TextField()
-    url_path_ro = fields.TextField()
-    url_path_sk = fields.TextField()
-    url_path_sl = fields.TextField()
-    url_path_es = fields.TextField()
-    url_path_sv = fields.TextField()
+    url_path_bg = fields.KeywordField(index=False)
+    url_path_hr = fields.KeywordField(index=False)
+    url_path_cs = fields.KeywordField(index=False)
+    url_path_da = fields.KeywordField(index=False)
+    url_path_nl = fields.KeywordField(index=False)
+    url_path_en = fields.KeywordField(index=False)
+    url_path_et = fields.KeywordField(index=False)
+    url_path_fi = fields.KeywordField(index=False)
+    url_path_fr = fields.KeywordField(index=False)
+    url_path_de = fields.KeywordField(index=False)
+    url_path_el = fields.KeywordField(index=False)
+    url_path_hu = fields.KeywordField(index=False)
+    url_path_ga = fields.KeywordField(index=False)
+    url_path_it = fields.KeywordField(index=False)
+    url_path_lv = fields.KeywordField(index=False)
+    url_path_lt = fields.KeywordField(index=False)
+    url_path_mt = fields.KeywordField(index=False)
+    url_path_pl = fields.KeywordField(index=False)
+    url_path_pt = fields.KeywordField(index=False)
+    url_path_ro = fields.KeywordField(index=False)
+    url_path_sk = fields.KeywordField(index=False)
+    url_path_sl = fields.KeywordField(index=False)
+    url_path_es = fields.KeywordField(index=False)
+    url_path_sv = fields.KeywordField(index=False)
 
     class Index:
         name = "ideas"
@@ -147,10 +167,35 @@ class IdeaDocument(Document):
 
     class Django:
         model = Idea
-        fields = ["uuid", "rating"]
-        related_models = [Category]
+        fields = ["uuid", "rating", "modified"]
+        related_models = [Category, CategoryTranslations]
+
+    def get_queryset(self):
+        return (
+            super()
+            .get_queryset()
+            .select_related("author")
+            .prefetch_related(
+                "translations",
+                models.Prefetch(
+                    "categories",
+                    queryset=Category.objects.prefetch_related("translations"),
+                ),
+            )
+        )
+
+    def get_indexing_queryset(self):
+        chunk_size = self.django.queryset_pagination or 500
+        return iterate_with_derivatives(
+            iterate_in_chunks(self.get_queryset(), chunk_size), chunk_size
+        )
 
     def prepare(self, instance):
+        # translations.all() reads the prefetched translations if any
+        translations_by_language = {
+            translations.language: translations
+            for translations in instance.translations.all()
+        }
         lang_code_underscored = settings.LANGUAGE_CODE.replace("-", "_")
         setattr(instance, f"title_{lang_code_underscored}", instance.title)
         setattr(instance, f"content_{lang_code_underscored}", instance.content)
@@ -163,7 +208,7 @@ class IdeaDocument(Document):
             lang_code_underscored = lang_code.replace("-", "_")
             setattr(instance, f"title_{lang_code_underscored}", "")
             setattr(instance, f"content_{lang_code_underscored}", "")
-            translations = instance.translations.filter(language=lang_code).first()
+            translations = translations_by_language.get(lang_code)
             if translations:
                 setattr(instance, f"title_{lang_code_underscored}", translations.title)
                 setattr(
@@ -180,7 +225,7 @@ class IdeaDocument(Document):
     def prepare_picture_thumbnail_url(self, instance):
         if not instance.picture:
             return ""
-        return instance.picture_thumbnail.url
+        return instance.picture_derivatives["thumbnail"].url
 
     def prepare_author(self, instance):
         author = instance.author
@@ -197,18 +242,37 @@ class IdeaDocument(Document):
     def prepare_categories(self, instance):
         categories = []
         for category in instance.categories.all():
+            translations_by_language = {
+                translations.language: translations
+                for translations in category.translations.all()
+            }
             category_dict = {"pk": category.pk}
             lang_code_underscored = settings.LANGUAGE_CODE.replace("-", "_")
             category_dict[f"title_{lang_code_underscored}"] = category.title
             for lang_code, lang_name in settings.LANGUAGES_EXCEPT_THE_DEFAULT:
                 lang_code_underscored = lang_code.replace("-", "_")
                 category_dict[f"title_{lang_code_underscored}"] = ""
-                translations = category.translations.filter(language=lang_code).first()
+                translations = translations_by_language.get(lang_code)
                 if translations:
                     category_dict[f"title_{lang_code_underscored}"] = translations.title
             categories.append(category_dict)
         return categories
 
+    @classmethod
+    def get_display_fields(cls, language=None):
+        """
+        Returns the fields which the search results show, so that hits
+        don't carry the texts and URLs of the other languages
+        """
+        lang_code_underscored = (language or get_language()).replace("-", "_")
+        return [
+            "uuid",
+            "modified",
+            "picture_thumbnail_url",
+            f"title_{lang_code_underscored}",
+            f"url_path_{lang_code_underscored}",
+        ]
+
     @property
     def translated_title(self):
         lang_code_underscored = get_language().replace("-", "_")
@@ -237,3 +301,5 @@ class IdeaDocument(Document):
         if isinstance(related_instance, Category):
             category = related_instance
             return category.category_ideas.all()
+        if isinstance(related_instance, CategoryTranslations):
+            return related_instance.category.category_ideas.all()
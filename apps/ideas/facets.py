@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.db import models, transaction
+
+from myproject.apps.categories.models import Category
+from .models import Idea, IdeaFacetCount, RATING_CHOICES
+
+FACET_FILTERS = (
+    ("author", "author"),
+    ("category", "categories"),
+    ("rating", "rating"),
+)
+
+
+def get_selected_facets(form):
+    return {
+        query_param: form.cleaned_data[query_param]
+        for query_param, filter_param in FACET_FILTERS
+        if form.cleaned_data.get(query_param)
+    }
+
+
+def compile_facet_filters(selected, filters=FACET_FILTERS, exclude=None):
+    """
+    Turns the selected facets into WHERE conditions for Idea querysets.
+    Many-to-many facets become EXISTS subqueries on the through table,
+    so the ideas don't need to be joined with it and made DISTINCT.
+    """
+    conditions = []
+    for query_param, filter_param in filters:
+        if query_param not in selected or query_param == exclude:
+            continue
+        value = selected[query_param]
+        field = Idea._meta.get_field(filter_param)
+        if field.many_to_many:
+            through = field.remote_field.through
+            conditions.append(models.Exists(through.objects.filter(**{
+                field.m2m_field_name(): models.OuterRef("pk"),
+                field.m2m_reverse_field_name(): value,
+            })))
+        else:
+            conditions.append(models.Q(**{filter_param: value}))
+    return conditions
+
+
+def filter_by_facets(qs, selected, filters=FACET_FILTERS, exclude=None):
+    return qs.filter(*compile_facet_filters(selected, filters, exclude))
+
+
+def count_facets(selected):
+    """
+    Counts the ideas per author, category and rating in a single query.
+    The counts of each facet are filtered by the other selected facets,
+    so that they show what selecting another value would give.
+    """
+    counts = {query_param: {} for query_param, filter_param in FACET_FILTERS}
+    grouped_querysets = []
+    for query_param, filter_param in FACET_FILTERS:
+        qs = filter_by_facets(Idea.objects.all(), selected, exclude=query_param)
+        grouped_querysets.append(
+            qs.order_by()
+            .values(value=models.F(filter_param))
+            .filter(value__isnull=False)
+            .annotate(
+                facet=models.Value(query_param, output_field=models.CharField()),
+                count=models.Count("pk", distinct=True),
+            )
+        )
+    first_qs, *other_querysets = grouped_querysets
+    for row in first_qs.union(*other_querysets, all=True):
+        counts[row["facet"]][row["value"]] = row["count"]
+    return counts
+
+
+def get_stored_facet_counts():
+    counts = {query_param: {} for query_param, filter_param in FACET_FILTERS}
+    for facet, value, count in IdeaFacetCount.objects.filter(
+        count__gt=0,
+    ).values_list("facet", "value", "count"):
+        counts[facet][value] = count
+    return counts
+
+
+def update_facet_count(facet, value, delta):
+    if value is None or not delta:
+        return
+    value = int(value)
+    updated = IdeaFacetCount.objects.filter(facet=facet, value=value).update(
+        count=models.F("count") + delta
+    )
+    if not updated:
+        facet_count, created = IdeaFacetCount.objects.get_or_create(
+            facet=facet, value=value, defaults={"count": delta}
+        )
+        if not created:
+            IdeaFacetCount.objects.filter(pk=facet_count.pk).update(
+                count=models.F("count") + delta
+            )
+
+
+def rebuild_facet_counts():
+    counts = count_facets({})
+    with transaction.atomic():
+        IdeaFacetCount.objects.all().delete()
+        IdeaFacetCount.objects.bulk_create([
+            IdeaFacetCount(facet=facet, value=value, count=count)
+            for facet, values in counts.items()
+            for value, count in values.items()
+        ])
+    return counts
+
+
+def get_facet_categories(selected):
+    if selected:
+        counts = count_facets(selected)
+    else:
+        # without a selection the counts are global and can be
+        # read from the table kept up to date by the signal handlers
+        counts = get_stored_facet_counts()
+        if not any(counts.values()):
+            # not filled by rebuild_idea_facet_counts yet
+            counts = count_facets({})
+
+    User = get_user_model()
+    authors = list(
+        User.objects.filter(pk__in=counts["author"]).order_by("username")
+    )
+    for author in authors:
+        author.idea_count = counts["author"][author.pk]
+
+    categories = list(
+        Category.objects.filter(pk__in=counts["category"]).order_by("title")
+    )
+    for category in categories:
+        category.idea_count = counts["category"][category.pk]
+
+    ratings = [
+        (value, display, counts["rating"].get(value, 0))
+        for value, display in RATING_CHOICES
+    ]
+    return {
+        "authors": authors,
+        "categories": categories,
+        "ratings": ratings,
+    }
@@ -100,16 +100,12 @@ class IdeaFilterForm(forms.Form):
     author = forms.ModelChoiceField(
         label=_("Author"),
         required=False,
-        queryset=User.objects.annotate(
-            idea_count=models.Count("authored_ideas")
-        ).filter(idea_count__gt=0),
+        queryset=User.objects.all(),
     )
     category = forms.ModelChoiceField(
         label=_("Category"),
         required=False,
-        queryset=Category.objects.annotate(
-            idea_count=models.Count("category_ideas")
-        ).filter(idea_count__gt=0),
+        queryset=Category.objects.all(),
     )
     rating = forms.ChoiceField(
         label=_("Rating"), required=False, choices=RATING_CHOICES
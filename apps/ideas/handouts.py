@@ -0,0 +1,36 @@
+import contextlib
+import hashlib
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+HANDOUTS_DIR = "handouts"
+
+
+def get_handout_name(idea_pk, language, modified):
+    return f"{HANDOUTS_DIR}/{idea_pk}/{language}-{modified:%Y%m%d%H%M%S%f}.pdf"
+
+
+def get_handout_etag(idea_pk, language, modified):
+    return hashlib.md5(
+        f"{idea_pk}:{language}:{modified.isoformat()}".encode("utf-8")
+    ).hexdigest()
+
+
+def get_stored_handout(name):
+    if not default_storage.exists(name):
+        return None
+    with default_storage.open(name, "rb") as f:
+        return f.read()
+
+
+def store_handout(name, pdf):
+    default_storage.save(name, ContentFile(pdf))
+
+
+def delete_handouts(idea_pk):
+    directory = f"{HANDOUTS_DIR}/{idea_pk}"
+    with contextlib.suppress(FileNotFoundError):
+        dirs, files = default_storage.listdir(directory)
+        for filename in files:
+            default_storage.delete(f"{directory}/{filename}")
@@ -0,0 +1,160 @@
+import logging
+from functools import lru_cache
+
+from myproject.apps.core.process_pools import get_process_pool, init_django_worker
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_POOL_NAME = "image_derivatives"
+IDEA_PICTURE_SPECS = ("picture_social", "picture_large", "picture_thumbnail")
+
+# modern formats in the order of preference: (format, MIME type, options)
+RESPONSIVE_FORMATS = (
+    ("AVIF", "image/avif", {"quality": 50}),
+    ("WEBP", "image/webp", {"quality": 80}),
+)
+# cropped sizes of the specs with responsive variants and their widths
+RESPONSIVE_PICTURE_SIZES = {
+    "picture_large": (800, 400),
+    "picture_thumbnail": (728, 250),
+}
+RESPONSIVE_PICTURE_WIDTHS = {
+    "picture_large": (400, 600, 800),
+    "picture_thumbnail": (364, 546, 728),
+}
+
+
+@lru_cache(maxsize=None)
+def get_supported_formats():
+    from PIL import Image
+
+    try:
+        import pillow_avif  # noqa: registers AVIF with older Pillow versions
+    except ImportError:
+        pass
+    Image.init()
+    return tuple(
+        (image_format, mime_type, options)
+        for image_format, mime_type, options in RESPONSIVE_FORMATS
+        if image_format in Image.SAVE
+    )
+
+
+def get_responsive_spec_name(spec_name, image_format, width):
+    return f"{spec_name}_{image_format.lower()}_{width}"
+
+
+def get_responsive_spec_fields():
+    from imagekit.models import ImageSpecField
+    from pilkit.processors import ResizeToFill
+
+    fields = []
+    for image_format, mime_type, options in get_supported_formats():
+        for spec_name, (spec_width, spec_height) in RESPONSIVE_PICTURE_SIZES.items():
+            for width in RESPONSIVE_PICTURE_WIDTHS[spec_name]:
+                height = round(width * spec_height / spec_width)
+                fields.append((
+                    get_responsive_spec_name(spec_name, image_format, width),
+                    ImageSpecField(
+                        source="picture",
+                        processors=[ResizeToFill(width, height)],
+                        format=image_format,
+                        options=options,
+                        cachefile_strategy=DeferredGeneration,
+                    ),
+                ))
+    return fields
+
+
+@lru_cache(maxsize=None)
+def get_all_picture_specs():
+    return IDEA_PICTURE_SPECS + tuple(
+        get_responsive_spec_name(spec_name, image_format, width)
+        for image_format, mime_type, options in get_supported_formats()
+        for spec_name in RESPONSIVE_PICTURE_SIZES
+        for width in RESPONSIVE_PICTURE_WIDTHS[spec_name]
+    )
+
+
+def get_picture_sources(derivatives):
+    """
+    Returns {"large": [...], "thumbnail": [...]} with a <source> per
+    supported format, listing only the widths that were generated.
+    """
+    sources = {}
+    for spec_name in RESPONSIVE_PICTURE_SIZES:
+        short_name = spec_name.replace("picture_", "", 1)
+        sources[short_name] = []
+        for image_format, mime_type, options in get_supported_formats():
+            srcset = []
+            for width in RESPONSIVE_PICTURE_WIDTHS[spec_name]:
+                derivative = derivatives.get(get_responsive_spec_name(
+                    short_name, image_format, width
+                ))
+                if derivative and derivative.exists:
+                    srcset.append(f"{derivative.url} {width}w")
+            if srcset:
+                sources[short_name].append(
+                    {"type": mime_type, "srcset": ", ".join(srcset)}
+                )
+    return sources
+
+
+class DeferredGeneration:
+    """
+    Cache file strategy which never generates derivatives while a page
+    is rendered. They are generated in the background after the upload
+    by schedule_idea_derivatives() or by the
+    generate_idea_derivatives management command.
+    """
+
+    def on_existence_required(self, file):
+        pass
+
+    def on_content_required(self, file):
+        pass
+
+    def on_source_saved(self, file):
+        pass
+
+
+def generate_idea_derivatives(idea_pk, force=False):
+    from .derivative_registry import register_derivative
+    from .models import Idea
+
+    idea = Idea.objects.filter(pk=idea_pk).first()
+    if idea is None or not idea.picture:
+        return []
+    generated = []
+    for spec_name in get_all_picture_specs():
+        cache_file = getattr(idea, spec_name)
+        if force or not cache_file.cachefile_backend.exists(cache_file):
+            cache_file.generate(force=True)
+            generated.append(cache_file.name)
+        register_derivative(idea.picture.name, spec_name, cache_file)
+    return generated
+
+
+def get_derivatives_pool(max_workers=None):
+    from django.conf import settings
+
+    return get_process_pool(
+        DERIVATIVES_POOL_NAME,
+        max_workers=max_workers
+        or getattr(settings, "IDEAS_DERIVATIVE_WORKERS", None),
+        initializer=init_django_worker,
+    )
+
+
+def log_generation_errors(future):
+    if future.exception() is not None:
+        logger.error(
+            "Generating image derivatives failed",
+            exc_info=future.exception(),
+        )
+
+
+def schedule_idea_derivatives(idea_pk):
+    future = get_derivatives_pool().submit(generate_idea_derivatives, idea_pk)
+    future.add_done_callback(log_generation_errors)
+    return future
@@ -0,0 +1,84 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myproject.apps.ideas.facets import FACET_FILTERS, filter_by_facets
+from myproject.apps.ideas.models import Idea, IdeaFacetCount
+
+PAGE_SIZE = getattr(settings, "PAGE_SIZE", 24)
+
+
+def filter_with_joins(qs, selected):
+    # the previous approach: one join per facet and DISTINCT over the ideas
+    for query_param, filter_param in FACET_FILTERS:
+        if query_param in selected:
+            qs = qs.filter(**{filter_param: selected[query_param]}).distinct()
+    return qs
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the query plans and latency of filtering ideas by facets "
+        "with joins and DISTINCT against EXISTS subqueries"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--author", type=int)
+        parser.add_argument("--category", type=int)
+        parser.add_argument("--rating", type=int)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        selected = {
+            query_param: options[query_param]
+            for query_param, filter_param in FACET_FILTERS
+            if options[query_param] is not None
+        }
+        if not selected:
+            most_used_category = (
+                IdeaFacetCount.objects.filter(facet="category")
+                .order_by("-count")
+                .first()
+            )
+            if not most_used_category:
+                raise CommandError(
+                    "There are no categorized ideas. Pass --author, "
+                    "--category or --rating explicitly."
+                )
+            selected["category"] = most_used_category.value
+        self.stdout.write(f"Selected facets: {selected}\n")
+
+        base_qs = Idea.objects.order_by("title", "uuid")
+        for label, qs in (
+            ("JOIN + DISTINCT", filter_with_joins(base_qs, selected)),
+            ("EXISTS", filter_by_facets(base_qs, selected)),
+        ):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(qs.explain())
+            page_timings = self.measure(
+                lambda: list(qs[:PAGE_SIZE]), options["repeat"]
+            )
+            count_timings = self.measure(qs.count, options["repeat"])
+            self.stdout.write(
+                f"first page: {self.format_timings(page_timings)}\n"
+                f"count:      {self.format_timings(count_timings)}\n"
+            )
+
+    @staticmethod
+    def measure(func, repeat):
+        timings = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    @staticmethod
+    def format_timings(timings):
+        return (
+            f"min {min(timings):.2f} ms, "
+            f"median {statistics.median(timings):.2f} ms, "
+            f"max {max(timings):.2f} ms"
+        )
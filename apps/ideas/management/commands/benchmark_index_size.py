@@ -0,0 +1,75 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from myproject.apps.ideas.documents import IdeaDocument
+from myproject.apps.ideas.search_indexing import bulk_index_ideas
+
+
+def get_legacy_mapping(mapping):
+    # the layout before: every display field analyzed as text
+    if isinstance(mapping, dict):
+        if mapping.get("type") == "keyword" and mapping.get("index") is False:
+            return {"type": "text"}
+        return {key: get_legacy_mapping(value) for key, value in mapping.items()}
+    return mapping
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes all ideas into a scratch index with the legacy mapping and "
+        "one with the current mapping, and compares their sizes and the "
+        "payload of a page of hits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--using", help="Alias of the ELASTICSEARCH_DSL connection")
+        parser.add_argument("--keep", action="store_true", help="Keep the scratch indices")
+
+    def handle(self, *args, **options):
+        document = IdeaDocument()
+        client = document._get_connection(options["using"])
+        mapping = document._doc_type.mapping.to_dict()
+        suffix = int(time.time())
+        layouts = [
+            ("legacy", get_legacy_mapping(mapping), True),
+            ("lean", mapping, IdeaDocument.get_display_fields(settings.LANGUAGE_CODE)),
+        ]
+        results = {}
+        for layout, layout_mapping, source in layouts:
+            index_name = f"{document._index._name}-benchmark-{layout}-{suffix}"
+            client.indices.create(
+                index=index_name,
+                body={
+                    "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+                    "mappings": layout_mapping,
+                },
+            )
+            try:
+                bulk_index_ideas(index_name=index_name, using=options["using"])
+                client.indices.forcemerge(index=index_name, max_num_segments=1)
+                client.indices.refresh(index=index_name)
+                stats = client.indices.stats(index=index_name)["indices"][index_name]
+                response = client.search(
+                    index=index_name,
+                    body={"size": getattr(settings, "PAGE_SIZE", 24), "_source": source},
+                )
+                results[layout] = {
+                    "store": stats["primaries"]["store"]["size_in_bytes"],
+                    "segments_memory": stats["primaries"]["segments"]["memory_in_bytes"],
+                    "payload": len(json.dumps(response["hits"]["hits"])),
+                }
+            finally:
+                if not options["keep"]:
+                    client.indices.delete(index=index_name, ignore=[404])
+
+        for label, key in (
+            ("Index size", "store"),
+            ("Segment heap", "segments_memory"),
+            ("Payload of a page of hits", "payload"),
+        ):
+            before, after = results["legacy"][key], results["lean"][key]
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(f"{label}: {before} B -> {after} B ({change:+.1f} %)")
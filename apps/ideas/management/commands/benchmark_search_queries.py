@@ -0,0 +1,76 @@
+import json
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from elasticsearch_dsl.connections import get_connection
+
+from myproject.apps.ideas.documents import IdeaDocument
+from myproject.apps.ideas.search_queries import (
+    TemplatedIdeaSearch,
+    build_idea_query,
+    build_legacy_idea_query,
+    put_search_template,
+)
+
+PAGE_SIZE = getattr(settings, "PAGE_SIZE", 24)
+BENCHMARK_TEMPLATE_ID = "ideas-search-benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the latency of the OR-ed match_phrase query with the "
+        "multi_match query builder and its stored search template"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("q", nargs="+", help="Search phrases")
+        parser.add_argument("--language", default=settings.LANGUAGE_CODE)
+        parser.add_argument("--author", type=int)
+        parser.add_argument("--category", type=int)
+        parser.add_argument("--rating", type=int)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        language = options["language"]
+        filters = {}
+        if options["author"]:
+            filters["author"] = options["author"]
+        if options["category"]:
+            filters["categories"] = [options["category"]]
+        if options["rating"]:
+            filters["rating"] = options["rating"]
+
+        search = IdeaDocument.search().source(
+            IdeaDocument.get_display_fields(language)
+        )
+        put_search_template(get_connection(search._using), BENCHMARK_TEMPLATE_ID)
+        for q in options["q"]:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'"{q}" {filters}'))
+            legacy_search = search.query(build_legacy_idea_query(q, language))
+            builder_search = search.query(build_idea_query(q, language, filters))
+            templated_search = TemplatedIdeaSearch(
+                search, BENCHMARK_TEMPLATE_ID, q, language, filters
+            ).source(IdeaDocument.get_display_fields(language))
+            for label, benchmarked_search, body in (
+                ("match_phrase OR", legacy_search, legacy_search.to_dict()),
+                ("multi_match", builder_search, builder_search.to_dict()),
+                ("stored template", templated_search, templated_search._params),
+            ):
+                benchmarked_search = benchmarked_search.extra(size=PAGE_SIZE)
+                timings = []
+                took = []
+                for i in range(options["repeat"]):
+                    start = time.perf_counter()
+                    # a clone, as searches cache their response
+                    response = benchmarked_search._clone().execute()
+                    timings.append((time.perf_counter() - start) * 1000)
+                    took.append(response.took)
+                self.stdout.write(
+                    f"{label}: {response.hits.total.value} hits, "
+                    f"request {len(json.dumps(body))} B, "
+                    f"took median {statistics.median(took)} ms, "
+                    f"round trip median {statistics.median(timings):.2f} ms, "
+                    f"max {max(timings):.2f} ms"
+                )
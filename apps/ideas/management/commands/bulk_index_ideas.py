@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myproject.apps.ideas.search_indexing import (
+    BULK_CHUNK_SIZE,
+    BULK_THREAD_COUNT,
+    bulk_index_ideas,
+)
+
+
+class Command(BaseCommand):
+    help = "Indexes all ideas in Elasticsearch with the bulk API"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+        parser.add_argument("--threads", type=int, default=BULK_THREAD_COUNT)
+        parser.add_argument(
+            "--index", help="Index name (defaults to the name of IdeaDocument)"
+        )
+        parser.add_argument(
+            "--using",
+            help="Alias of the ELASTICSEARCH_DSL connection, "
+            "e.g. one pointing to a local test instance",
+        )
+
+    def handle(self, *args, **options):
+        stats = bulk_index_ideas(
+            index_name=options["index"],
+            using=options["using"],
+            chunk_size=options["chunk_size"],
+            thread_count=options["threads"],
+            refresh=True,
+        )
+        for error in stats["errors"][:10]:
+            self.stderr.write(str(error))
+        self.stdout.write(
+            f"Indexed {stats['indexed']} ideas in {stats['seconds']:.1f} s "
+            f"({stats['docs_per_second']:.0f} docs/sec)."
+        )
+        if stats["errors"]:
+            raise CommandError(f"{len(stats['errors'])} ideas could not be indexed.")
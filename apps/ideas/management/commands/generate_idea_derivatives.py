@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import as_completed
+
+from django.core.management.base import BaseCommand
+
+from myproject.apps.ideas.image_derivatives import (
+    generate_idea_derivatives,
+    get_derivatives_pool,
+)
+from myproject.apps.ideas.models import Idea
+
+
+class Command(BaseCommand):
+    help = "Generates the missing picture derivatives of all ideas in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Number of worker processes (defaults to the number of CPUs)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate the derivatives even if they exist",
+        )
+
+    def handle(self, *args, **options):
+        idea_pks = list(
+            Idea.objects.exclude(picture="").values_list("pk", flat=True)
+        )
+        pool = get_derivatives_pool(max_workers=options["workers"])
+        start = time.perf_counter()
+        futures = [
+            pool.submit(generate_idea_derivatives, idea_pk, options["force"])
+            for idea_pk in idea_pks
+        ]
+        generated_count = failed_count = 0
+        for future in as_completed(futures):
+            try:
+                generated_count += len(future.result())
+            except Exception as e:
+                failed_count += 1
+                self.stderr.write(f"Error: {e}")
+        duration = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {generated_count} derivatives for {len(idea_pks)} ideas "
+            f"in {duration:.1f} s ({failed_count} failed)."
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myproject.apps.ideas.search_indexing import process_idea_categories_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Updates the nested categories of the indexed ideas queued by "
+        "category changes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when it's empty",
+        )
+        parser.add_argument("--interval", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        while True:
+            updated_count = process_idea_categories_queue()
+            if updated_count is not None:
+                # failed items were postponed, so the next batch moves on
+                self.stdout.write(f"Updated the categories of {updated_count} ideas.")
+                continue
+            # empty, or only postponed items are left to retry later
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
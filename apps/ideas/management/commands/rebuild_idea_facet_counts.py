@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myproject.apps.ideas.facets import (
+    count_facets,
+    get_stored_facet_counts,
+    rebuild_facet_counts,
+)
+
+
+class Command(BaseCommand):
+    help = "Rebuilds or checks the stored author, category and rating counts of ideas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare the stored counts with freshly computed ones",
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            counts = rebuild_facet_counts()
+            total = sum(len(values) for values in counts.values())
+            self.stdout.write(self.style.SUCCESS(
+                f"Stored {total} facet counts."
+            ))
+            return
+
+        expected = count_facets({})
+        stored = get_stored_facet_counts()
+        mismatches = []
+        for facet, values in expected.items():
+            for value in set(values) | set(stored[facet]):
+                expected_count = values.get(value, 0)
+                stored_count = stored[facet].get(value, 0)
+                if expected_count != stored_count:
+                    mismatches.append(
+                        f"{facet}={value}: stored {stored_count}, "
+                        f"expected {expected_count}"
+                    )
+        for mismatch in mismatches:
+            self.stderr.write(mismatch)
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} facet counts are out of date. "
+                "Run the command without --check to rebuild them."
+            )
+        self.stdout.write(self.style.SUCCESS("The stored facet counts are up to date."))
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import now as timezone_now
+
+from myproject.apps.ideas.documents import IdeaDocument
+from myproject.apps.ideas.search_queries import SEARCH_TEMPLATE_ID, put_search_template
+from myproject.apps.ideas.search_indexing import (
+    BULK_CHUNK_SIZE,
+    BULK_THREAD_COUNT,
+    SYNC_OVERLAP,
+    bulk_index_ideas,
+    catch_up_index,
+    create_index_generation,
+    delete_old_generations,
+    swap_alias,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds a new versioned ideas index, checks it and switches "
+        "the alias to it, so that search keeps working during the rebuild"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+        parser.add_argument("--threads", type=int, default=BULK_THREAD_COUNT)
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=1,
+            help="Number of previous indices to keep for swapping back",
+        )
+        parser.add_argument(
+            "--using",
+            help="Alias of the ELASTICSEARCH_DSL connection, "
+            "e.g. one pointing to a local test instance",
+        )
+
+    def handle(self, *args, **options):
+        document = IdeaDocument()
+        client = document._get_connection(options["using"])
+        alias = document._index._name
+        bulk_options = dict(
+            using=options["using"],
+            chunk_size=options["chunk_size"],
+            thread_count=options["threads"],
+        )
+
+        # also covers transactions which were open when the snapshot began
+        overlap = timedelta(seconds=SYNC_OVERLAP)
+        started = timezone_now()
+        index_name = create_index_generation(alias, using=options["using"])
+        self.stdout.write(f"Filling {index_name}...")
+        stats = bulk_index_ideas(index_name=index_name, **bulk_options)
+
+        # ideas saved or deleted meanwhile were written to the old index only
+        caught_up = timezone_now()
+        catch_up_stats = catch_up_index(index_name, since=started - overlap, **bulk_options)
+        errors = stats["errors"] + catch_up_stats["errors"]
+        if errors:
+            client.indices.delete(index=index_name)
+            for error in errors[:10]:
+                self.stderr.write(str(error))
+            raise CommandError(
+                f"{len(errors)} ideas could not be indexed in {index_name}; "
+                f"the alias was not changed."
+            )
+
+        if SEARCH_TEMPLATE_ID:
+            # the new index is searched with the current template
+            put_search_template(client, SEARCH_TEMPLATE_ID)
+        swap_alias(client, alias, index_name)
+        # writes between the catch-up and the swap went to the old index
+        final_stats = catch_up_index(index_name, since=caught_up - overlap, **bulk_options)
+        for error in final_stats["errors"][:10]:
+            self.stderr.write(str(error))
+        indexed_count = client.count(index=index_name)["count"]
+        deleted = delete_old_generations(client, alias, keep=options["keep"])
+        for deleted_index_name in deleted:
+            self.stdout.write(f"Deleted {deleted_index_name}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{alias} now points to {index_name} with {indexed_count} ideas "
+            f"({stats['docs_per_second']:.0f} docs/sec)."
+        ))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from myproject.apps.ideas.image_derivatives import (
+    RESPONSIVE_PICTURE_SIZES,
+    get_responsive_spec_name,
+    get_supported_formats,
+)
+from myproject.apps.ideas.models import Idea
+
+
+def get_file_size(cache_file):
+    try:
+        return cache_file.storage.size(cache_file.name)
+    except (FileNotFoundError, OSError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports how many bytes the WebP/AVIF variants of idea pictures "
+        "save compared to the PNG derivatives of the same size"
+    )
+
+    def handle(self, *args, **options):
+        formats = [
+            image_format
+            for image_format, mime_type, format_options in get_supported_formats()
+        ]
+        self.stdout.write(f"Modern formats: {', '.join(formats) or 'none'}\n")
+        total_legacy_size = total_saved = 0
+        for idea in Idea.objects.exclude(picture="").order_by("title"):
+            sizes = []
+            for spec_name, (width, height) in RESPONSIVE_PICTURE_SIZES.items():
+                legacy_size = get_file_size(getattr(idea, spec_name))
+                if legacy_size is None:
+                    continue
+                modern_sizes = {}
+                for image_format in formats:
+                    size = get_file_size(getattr(
+                        idea, get_responsive_spec_name(spec_name, image_format, width)
+                    ))
+                    if size is not None:
+                        modern_sizes[image_format] = size
+                if not modern_sizes:
+                    continue
+                best_format = min(modern_sizes, key=modern_sizes.get)
+                saved = legacy_size - modern_sizes[best_format]
+                total_legacy_size += legacy_size
+                total_saved += saved
+                sizes.append(
+                    f"{spec_name}: {legacy_size} B -> {modern_sizes[best_format]} B "
+                    f"{best_format} ({saved} B saved)"
+                )
+            if sizes:
+                self.stdout.write(f"{idea.title} ({idea.pk})")
+                for line in sizes:
+                    self.stdout.write(f"    {line}")
+
+        percentage = total_saved / total_legacy_size * 100 if total_legacy_size else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Saved {total_saved} of {total_legacy_size} bytes ({percentage:.1f} %)."
+        ))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myproject.apps.ideas.documents import IdeaDocument
+from myproject.apps.ideas.search_queries import SEARCH_TEMPLATE_ID, put_search_template
+
+
+class Command(BaseCommand):
+    help = (
+        "Stores the idea search template in Elasticsearch under "
+        "IDEAS_SEARCH_TEMPLATE_ID; run it before enabling the setting and "
+        "after each change of the template"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--id", default=SEARCH_TEMPLATE_ID, help="Defaults to IDEAS_SEARCH_TEMPLATE_ID"
+        )
+        parser.add_argument("--using", help="Alias of the ELASTICSEARCH_DSL connection")
+
+    def handle(self, *args, **options):
+        if not options["id"]:
+            raise CommandError("Set IDEAS_SEARCH_TEMPLATE_ID or pass --id.")
+        client = IdeaDocument()._get_connection(options["using"])
+        put_search_template(client, options["id"])
+        self.stdout.write(self.style.SUCCESS(f"Stored the search template {options['id']}."))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myproject.apps.ideas.search_indexing import (
+    BULK_CHUNK_SIZE,
+    BULK_THREAD_COUNT,
+    sync_idea_index,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Indexes the ideas changed and removes the ideas deleted since "
+        "the last sync, once or in a loop"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+        parser.add_argument("--threads", type=int, default=BULK_THREAD_COUNT)
+        parser.add_argument(
+            "--using", help="Alias of the ELASTICSEARCH_DSL connection"
+        )
+        parser.add_argument(
+            "--full", action="store_true", help="Ignore the watermark once"
+        )
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep syncing every --interval seconds"
+        )
+        parser.add_argument("--interval", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        full = options["full"]
+        while True:
+            stats = sync_idea_index(
+                using=options["using"],
+                chunk_size=options["chunk_size"],
+                thread_count=options["threads"],
+                full=full,
+            )
+            full = False
+            for error in stats["errors"][:10]:
+                self.stderr.write(str(error))
+            self.stdout.write(
+                f"Indexed {stats['indexed']} and deleted {stats['deleted']} ideas "
+                f"in {stats['seconds']:.1f} s ({len(stats['errors'])} errors)."
+            )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
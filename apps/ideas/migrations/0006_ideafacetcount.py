@@ -0,0 +1,31 @@
+# Generated by Django 3.0.14 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+# The historical Idea model has no rating field, so the counts can't be
+# filled here. Run "python manage.py rebuild_idea_facet_counts" after
+# migrating; until then the sidebar counts are computed per request.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0005_remove_idea_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaFacetCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('author', 'Author'), ('category', 'Category'), ('rating', 'Rating')], max_length=20, verbose_name='Facet')),
+                ('value', models.PositiveIntegerField(verbose_name='Value')),
+                ('count', models.IntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Idea Facet Count',
+                'verbose_name_plural': 'Idea Facet Counts',
+                'unique_together': {('facet', 'value')},
+            },
+        ),
+    ]
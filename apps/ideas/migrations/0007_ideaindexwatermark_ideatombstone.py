@@ -0,0 +1,37 @@
+# Generated by Django 3.0.14 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0006_ideafacetcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaIndexWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index_name', models.CharField(max_length=100, unique=True, verbose_name='Index name')),
+                ('synced_until', models.DateTimeField(blank=True, null=True, verbose_name='Synced until')),
+            ],
+            options={
+                'verbose_name': 'Idea Index Watermark',
+                'verbose_name_plural': 'Idea Index Watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='IdeaTombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idea_uuid', models.UUIDField(verbose_name='Idea UUID')),
+                ('deleted', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Deleted')),
+            ],
+            options={
+                'verbose_name': 'Idea Tombstone',
+                'verbose_name_plural': 'Idea Tombstones',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.0.14 on 2026-10-19 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0007_ideaindexwatermark_ideatombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaCategoriesQueueItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('idea_uuid', models.UUIDField(verbose_name='Idea UUID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Idea Categories Queue Item',
+                'verbose_name_plural': 'Idea Categories Queue Items',
+                'ordering': ['pk'],
+            },
+        ),
+    ]
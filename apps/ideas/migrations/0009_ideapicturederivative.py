@@ -0,0 +1,29 @@
+# Generated by Django 3.0.14 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0008_ideacategoriesqueueitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdeaPictureDerivative',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_name', models.CharField(max_length=255, verbose_name='Source name')),
+                ('spec_name', models.CharField(max_length=100, verbose_name='Spec name')),
+                ('name', models.CharField(max_length=255, verbose_name='Name')),
+                ('width', models.PositiveIntegerField(verbose_name='Width')),
+                ('height', models.PositiveIntegerField(verbose_name='Height')),
+            ],
+            options={
+                'verbose_name': 'Idea Picture Derivative',
+                'verbose_name_plural': 'Idea Picture Derivatives',
+                'unique_together': {('source_name', 'spec_name')},
+            },
+        ),
+    ]
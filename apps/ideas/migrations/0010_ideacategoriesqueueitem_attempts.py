@@ -0,0 +1,24 @@
+# Generated by Django 3.0.14 on 2026-10-19 11:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0009_ideapicturederivative'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ideacategoriesqueueitem',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Failed attempts'),
+        ),
+        migrations.AddField(
+            model_name='ideacategoriesqueueitem',
+            name='next_attempt',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Next attempt'),
+        ),
+    ]
@@ -5,6 +5,8 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.urls import reverse
 from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.timezone import now as timezone_now
 from django.utils.translation import gettext_lazy as _
 from imagekit.models import ImageSpecField
 from pilkit.processors import ResizeToFill
@@ -22,6 +24,14 @@ from myproject.apps.core.models import (
 
 from myproject.apps.core.model_fields import TranslatedField
 from myproject.apps.core.models import CreationModificationDateBase, UrlBase
+from myproject.apps.core.models import TranslatedQuerySet
+from myproject.apps.core.url_paths import get_url_path
+from .image_derivatives import (
+    DeferredGeneration,
+    get_all_picture_specs,
+    get_picture_sources,
+    get_responsive_spec_fields,
+)
 
 def upload_to(instance, filename):
     now = timezone_now()
@@ -49,6 +59,25 @@ OwnerBase = generic_relation(
     }
 )
 
+def get_idea_url_path(pk, language=None):
+    return get_url_path(
+        "ideas:idea_detail",
+        pk,
+        language,
+        placeholder="00000000-0000-0000-0000-000000000000",
+    )
+
+
+class IdeaQuerySet(TranslatedQuerySet):
+    def with_categories(self, language=None):
+        from myproject.apps.categories.models import Category
+
+        return self.prefetch_related(models.Prefetch(
+            "categories",
+            queryset=Category.objects.with_translations(language),
+        ))
+
+
 class Idea(CreationModificationDateBase, UrlBase):
     uuid = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     author = models.ForeignKey(
@@ -69,12 +98,19 @@ class Idea(CreationModificationDateBase, UrlBase):
         processors=[ResizeToFill(1024, 512)],
         format="JPEG",
         options={"quality": 100},
+        cachefile_strategy=DeferredGeneration,
     )
     picture_large = ImageSpecField(
-        source="picture", processors=[ResizeToFill(800, 400)], format="PNG"
+        source="picture",
+        processors=[ResizeToFill(800, 400)],
+        format="PNG",
+        cachefile_strategy=DeferredGeneration,
     )
     picture_thumbnail = ImageSpecField(
-        source="picture", processors=[ResizeToFill(728, 250)], format="PNG"
+        source="picture",
+        processors=[ResizeToFill(728, 250)],
+        format="PNG",
+        cachefile_strategy=DeferredGeneration,
     )
     categories = models.ManyToManyField(
         "categories.Category",
@@ -87,6 +123,8 @@ class Idea(CreationModificationDateBase, UrlBase):
     translated_title = TranslatedField("title")
     translated_content = TranslatedField("content")
 
+    objects = IdeaQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Idea")
         verbose_name_plural = _("Ideas")
@@ -95,7 +133,18 @@ class Idea(CreationModificationDateBase, UrlBase):
         return self.title
 
     def get_url_path(self):
-        return reverse("ideas:idea_detail", kwargs={"pk": self.pk})
+        return get_idea_url_path(self.pk)
+
+    @cached_property
+    def picture_derivatives(self):
+        from .derivative_registry import prefetch_picture_derivatives
+
+        prefetch_picture_derivatives([self], get_all_picture_specs())
+        return self.__dict__["picture_derivatives"]
+
+    @property
+    def picture_sources(self):
+        return get_picture_sources(self.picture_derivatives)
 
     @property
     def structured_data(self):
@@ -114,19 +163,23 @@ class Idea(CreationModificationDateBase, UrlBase):
                 "name": self.author.get_full_name() or self.author.username,
             }
         if self.picture:
-            data["image"] = self.picture_social.url
+            data["image"] = self.picture_derivatives["social"].url
         return data
 
     def delete(self, *args, **kwargs):
         from django.core.files.storage import default_storage
         if self.picture:
-            with contextlib.suppress(FileNotFoundError):
-                default_storage.delete(self.picture_social.path)
-                default_storage.delete(self.picture_large.path)
-                default_storage.delete(self.picture_thumbnail.path)
+            for spec_name in get_all_picture_specs():
+                with contextlib.suppress(FileNotFoundError):
+                    default_storage.delete(getattr(self, spec_name).path)
             self.picture.delete()
         super().delete(*args, **kwargs)
 
+# WebP/AVIF variants of picture_large and picture_thumbnail in several widths
+for spec_name, spec_field in get_responsive_spec_fields():
+    Idea.add_to_class(spec_name, spec_field)
+
+
 class IdeaTranslations(models.Model):
     idea = models.ForeignKey(
         Idea,
@@ -147,6 +200,82 @@ class IdeaTranslations(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class IdeaFacetCount(models.Model):
+    FACET_CHOICES = (
+        ("author", _("Author")),
+        ("category", _("Category")),
+        ("rating", _("Rating")),
+    )
+    facet = models.CharField(_("Facet"), max_length=20, choices=FACET_CHOICES)
+    value = models.PositiveIntegerField(_("Value"))
+    count = models.IntegerField(_("Count"), default=0)
+
+    class Meta:
+        verbose_name = _("Idea Facet Count")
+        verbose_name_plural = _("Idea Facet Counts")
+        unique_together = [["facet", "value"]]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
+
+
+class IdeaPictureDerivative(models.Model):
+    source_name = models.CharField(_("Source name"), max_length=255)
+    spec_name = models.CharField(_("Spec name"), max_length=100)
+    name = models.CharField(_("Name"), max_length=255)
+    width = models.PositiveIntegerField(_("Width"))
+    height = models.PositiveIntegerField(_("Height"))
+
+    class Meta:
+        verbose_name = _("Idea Picture Derivative")
+        verbose_name_plural = _("Idea Picture Derivatives")
+        unique_together = [["source_name", "spec_name"]]
+
+    def __str__(self):
+        return self.name
+
+
+class IdeaIndexWatermark(models.Model):
+    index_name = models.CharField(_("Index name"), max_length=100, unique=True)
+    synced_until = models.DateTimeField(_("Synced until"), blank=True, null=True)
+
+    class Meta:
+        verbose_name = _("Idea Index Watermark")
+        verbose_name_plural = _("Idea Index Watermarks")
+
+    def __str__(self):
+        return f"{self.index_name}: {self.synced_until}"
+
+
+class IdeaTombstone(models.Model):
+    idea_uuid = models.UUIDField(_("Idea UUID"))
+    deleted = models.DateTimeField(_("Deleted"), auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Idea Tombstone")
+        verbose_name_plural = _("Idea Tombstones")
+
+    def __str__(self):
+        return f"{self.idea_uuid} ({self.deleted})"
+
+
+class IdeaCategoriesQueueItem(models.Model):
+    idea_uuid = models.UUIDField(_("Idea UUID"))
+    created = models.DateTimeField(_("Created"), auto_now_add=True, db_index=True)
+    attempts = models.PositiveIntegerField(_("Failed attempts"), default=0)
+    next_attempt = models.DateTimeField(
+        _("Next attempt"), default=timezone_now, db_index=True
+    )
+
+    class Meta:
+        verbose_name = _("Idea Categories Queue Item")
+        verbose_name_plural = _("Idea Categories Queue Items")
+        ordering = ["pk"]
+
+    def __str__(self):
+        return f"{self.idea_uuid} ({self.created})"
 			
 class Like(FavoriteObjectBase, OwnerBase):
     class Meta:
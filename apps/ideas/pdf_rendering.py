@@ -0,0 +1,105 @@
+import math
+import os
+import signal
+from concurrent.futures import TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from myproject.apps.core.process_pools import discard_process_pool, get_process_pool
+
+HANDOUT_POOL_NAME = "handouts"
+# how long a request waits for a render beyond its timeout, e.g. while
+# it is queued behind other renders
+RENDER_WAIT_GRACE = 30
+
+
+class HandoutRenderError(Exception):
+    pass
+
+
+class HandoutRenderTimeout(HandoutRenderError):
+    pass
+
+
+# state of the render worker processes
+_font_config = None
+_stylesheets = []
+
+
+def init_render_worker(stylesheet_urls):
+    from weasyprint import CSS
+    from weasyprint.fonts import FontConfiguration
+
+    global _font_config, _stylesheets
+    _font_config = FontConfiguration()
+    _stylesheets = [
+        CSS(url=url, font_config=_font_config) for url in stylesheet_urls
+    ]
+
+
+def raise_render_timeout(signum, frame):
+    raise HandoutRenderTimeout()
+
+
+def render_pdf(html, base_url=None, timeout=None):
+    from weasyprint import HTML
+
+    # the tasks run in the main thread of the worker, so an alarm
+    # stops a long render and frees the worker for the next task
+    if timeout:
+        signal.signal(signal.SIGALRM, raise_render_timeout)
+        signal.alarm(math.ceil(timeout))
+    try:
+        return HTML(string=html, base_url=base_url).write_pdf(
+            stylesheets=_stylesheets, font_config=_font_config
+        )
+    finally:
+        if timeout:
+            signal.alarm(0)
+
+
+def get_render_pool():
+    from django.conf import settings
+
+    return get_process_pool(
+        HANDOUT_POOL_NAME,
+        max_workers=getattr(
+            settings, "IDEAS_HANDOUT_RENDER_WORKERS", os.cpu_count()
+        ),
+        initializer=init_render_worker,
+        initargs=(get_handout_stylesheets(),),
+    )
+
+
+def get_handout_stylesheets():
+    from django.conf import settings
+
+    return getattr(settings, "IDEAS_HANDOUT_STYLESHEETS", [
+        "https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css",
+    ])
+
+
+def render_handout_pdf(html, base_url=None):
+    """
+    Renders the HTML to PDF in one of the warm render workers, which
+    have loaded the fonts and the handout stylesheets once at start.
+    Raises HandoutRenderTimeout if rendering takes longer than
+    IDEAS_HANDOUT_RENDER_TIMEOUT seconds or the request waits longer
+    than IDEAS_HANDOUT_RENDER_WAIT seconds, and HandoutRenderError if
+    a worker died.
+    """
+    from django.conf import settings
+
+    timeout = getattr(settings, "IDEAS_HANDOUT_RENDER_TIMEOUT", 30)
+    wait = getattr(settings, "IDEAS_HANDOUT_RENDER_WAIT", timeout + RENDER_WAIT_GRACE)
+    try:
+        future = get_render_pool().submit(render_pdf, html, base_url, timeout)
+        return future.result(timeout=wait)
+    except TimeoutError:
+        # the alarm in the worker ends a running render; killing the
+        # worker would break the pool and the other requests' renders
+        future.cancel()
+        raise HandoutRenderTimeout()
+    except BrokenProcessPool as exc:
+        # a worker died; start with a fresh pool on the next request
+        discard_process_pool(HANDOUT_POOL_NAME)
+        raise HandoutRenderError() from exc
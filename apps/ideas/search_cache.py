@@ -0,0 +1,124 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from myproject.apps.core.page_cache import invalidate_tags
+from myproject.apps.core.pagination import InvalidCursor, SearchPage, SearchPaginator
+
+SEARCH_CACHE_ALIAS = getattr(settings, "IDEAS_SEARCH_CACHE_ALIAS", "default")
+SEARCH_CACHE_TIMEOUT = getattr(settings, "IDEAS_SEARCH_CACHE_TIMEOUT", 60 * 10)
+
+
+def get_search_cache():
+    return caches[SEARCH_CACHE_ALIAS]
+
+
+def normalize_query(q):
+    # the phrase queries are analyzed case-insensitively
+    return " ".join(q.lower().split())
+
+
+def get_generation_key(index_name):
+    return f"search_generation:{index_name}"
+
+
+def get_search_page_tag(index_name):
+    return f"search:{index_name}"
+
+
+def get_search_generation(index_name):
+    cache = get_search_cache()
+    key = get_generation_key(index_name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_search_generation(index_name):
+    cache = get_search_cache()
+    key = get_generation_key(index_name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    # the cached pages which show the search results
+    invalidate_tags(get_search_page_tag(index_name))
+
+
+def get_search_cache_key(index_name, language, q, number, cursor, filters=None):
+    generation = get_search_generation(index_name)
+    filters = sorted((filters or {}).items())
+    data = f"{normalize_query(q)}\n{filters}\n{number or ''}\n{cursor or ''}"
+    data_hash = hashlib.md5(data.encode("utf-8")).hexdigest()
+    return f"search:{index_name}:{generation}:{language}:{data_hash}"
+
+
+class CachedHit:
+    """
+    The fields of a search hit which the idea cards need
+    """
+
+    def __init__(self, uuid, modified, translated_title, url_path,
+                 picture_thumbnail_url):
+        self.uuid = uuid
+        self.modified = modified
+        self.translated_title = translated_title
+        self.url_path = url_path
+        self.picture_thumbnail_url = picture_thumbnail_url
+
+    @classmethod
+    def from_document(cls, document):
+        return cls(
+            uuid=document.uuid,
+            modified=document.modified,
+            translated_title=document.translated_title,
+            url_path=document.get_url_path(),
+            picture_thumbnail_url=document.picture_thumbnail_url,
+        )
+
+    def get_url_path(self):
+        return self.url_path
+
+
+def get_search_page(search, index_name, language, q, number=None, cursor=None,
+                    per_page=24, sort=("_score", "uuid"), filters=None):
+    """
+    Returns a page of search results for the query. The hit ids and
+    display fields are cached per language, query, filters and page; saving or
+    deleting indexed objects bumps the index generation, which expires
+    all cached results of that index.
+    """
+    cache = get_search_cache()
+    key = get_search_cache_key(index_name, language, q, number, cursor, filters)
+    paginator = SearchPaginator(search, per_page, sort=sort)
+    data = cache.get(key)
+    if data is not None:
+        paginator.count = data["count"]
+        return SearchPage(
+            [CachedHit(**hit) for hit in data["hits"]],
+            data["number"],
+            paginator,
+            next_cursor=data["next_cursor"],
+        )
+
+    try:
+        page = paginator.page(number, cursor)
+    except InvalidCursor:
+        page = paginator.page(number)
+    hits = [CachedHit.from_document(document) for document in page]
+    cache.set(
+        key,
+        {
+            "hits": [hit.__dict__ for hit in hits],
+            "count": paginator.count,
+            "number": page.number,
+            "next_cursor": page.next_cursor,
+        },
+        SEARCH_CACHE_TIMEOUT,
+    )
+    page.object_list = hits
+    return page
@@ -0,0 +1,360 @@
+import itertools
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils.timezone import now as timezone_now
+from elasticsearch.helpers import bulk, parallel_bulk, scan
+
+from myproject.apps.categories.models import Category
+from myproject.apps.core.pagination import iterate_in_chunks
+from .documents import IdeaDocument, iterate_with_derivatives
+from .models import (
+    Idea,
+    IdeaCategoriesQueueItem,
+    IdeaIndexWatermark,
+    IdeaTombstone,
+)
+from .search_cache import bump_search_generation
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = 500
+BULK_THREAD_COUNT = 4
+RELATED_CHUNK_SIZE = getattr(settings, "IDEAS_RELATED_REINDEX_CHUNK_SIZE", 200)
+# covers transactions which were still open while the previous sync ran
+SYNC_OVERLAP = getattr(settings, "IDEAS_INDEX_SYNC_OVERLAP", 60)
+# failed category updates are retried after 1, 2, 4, ... minutes
+QUEUE_RETRY_DELAY = getattr(settings, "IDEAS_CATEGORIES_QUEUE_RETRY_DELAY", 60)
+QUEUE_MAX_RETRY_DELAY = getattr(
+    settings, "IDEAS_CATEGORIES_QUEUE_MAX_RETRY_DELAY", 60 * 60
+)
+
+
+def generate_index_actions(document, ideas, index_name=None,
+                           chunk_size=BULK_CHUNK_SIZE):
+    index_name = index_name or document._index._name
+    for idea in iterate_with_derivatives(ideas, chunk_size):
+        yield {
+            "_op_type": "index",
+            "_index": index_name,
+            "_id": str(idea.pk),
+            "_source": document.prepare(idea),
+        }
+
+
+def bulk_index_ideas(
+    ideas=None,
+    index_name=None,
+    using=None,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=BULK_THREAD_COUNT,
+    refresh=False,
+):
+    """
+    Streams the prepared idea documents to the bulk API in parallel
+    batches. The ideas are read in chunks with their translations,
+    categories and authors prefetched. Returns the indexing statistics.
+    """
+    document = IdeaDocument()
+    if ideas is None:
+        ideas = document.get_indexing_queryset()
+    client = document._get_connection(using)
+    stats = {"indexed": 0, "errors": [], "seconds": 0.0, "docs_per_second": 0.0}
+
+    start = time.perf_counter()
+    for ok, info in parallel_bulk(
+        client,
+        generate_index_actions(document, ideas, index_name, chunk_size),
+        thread_count=thread_count,
+        chunk_size=chunk_size,
+        raise_on_error=False,
+        raise_on_exception=False,
+    ):
+        if ok:
+            stats["indexed"] += 1
+        else:
+            stats["errors"].append(info)
+    if refresh:
+        client.indices.refresh(index=index_name or document._index._name)
+    if stats["indexed"]:
+        # the searches read from the alias, also while a new index behind
+        # it is caught up
+        bump_search_generation(document._index._name)
+
+    stats["seconds"] = time.perf_counter() - start
+    if stats["seconds"]:
+        stats["docs_per_second"] = stats["indexed"] / stats["seconds"]
+    return stats
+
+
+def get_index_generations(client, alias):
+    """
+    Returns the names of the versioned indices behind the alias,
+    oldest first; the names end with their creation time
+    """
+    indices = client.indices.get(index=f"{alias}-*", ignore_unavailable=True)
+    return sorted(
+        index_name
+        for index_name in indices
+        if index_name[len(alias) + 1:].isdigit()
+    )
+
+
+def get_aliased_indices(client, alias):
+    if not client.indices.exists_alias(name=alias):
+        return []
+    return list(client.indices.get_alias(name=alias))
+
+
+def create_index_generation(alias, using=None):
+    index_name = f"{alias}-{time.strftime('%Y%m%d%H%M%S')}"
+    IdeaDocument._index.clone(name=index_name).create(using=using)
+    return index_name
+
+
+def swap_alias(client, alias, index_name):
+    """
+    Points the alias to the index in one atomic request. A concrete
+    index named like the alias, left from before the aliases, is
+    removed in the same request.
+    """
+    actions = [
+        {"remove": {"index": old_index_name, "alias": alias}}
+        for old_index_name in get_aliased_indices(client, alias)
+    ]
+    if not actions and client.indices.exists(index=alias):
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": index_name, "alias": alias}})
+    client.indices.update_aliases(body={"actions": actions})
+    bump_search_generation(alias)
+
+
+def delete_old_generations(client, alias, keep=1):
+    """
+    Deletes all but the newest `keep` indices which the alias doesn't
+    point to; they are kept to be able to swap back
+    """
+    aliased = set(get_aliased_indices(client, alias))
+    old_generations = [
+        index_name
+        for index_name in get_index_generations(client, alias)
+        if index_name not in aliased
+    ]
+    deleted = old_generations[:-keep] if keep else old_generations
+    for index_name in deleted:
+        client.indices.delete(index=index_name)
+    return deleted
+
+
+def get_ideas_by_pks(queryset, pks, chunk_size=BULK_CHUNK_SIZE):
+    pks = list(pks)
+    for start in range(0, len(pks), chunk_size):
+        yield from queryset.filter(pk__in=pks[start:start + chunk_size])
+
+
+def catch_up_index(
+    index_name,
+    since,
+    using=None,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=BULK_THREAD_COUNT,
+):
+    """
+    Brings an index which was filled from a snapshot up to date: indexes
+    the ideas saved since then or missing in the index, and deletes the
+    documents of ideas which don't exist anymore
+    """
+    document = IdeaDocument()
+    client = document._get_connection(using)
+    client.indices.refresh(index=index_name)
+    indexed_ids = {
+        hit["_id"]
+        for hit in scan(
+            client, index=index_name, query={"query": {"match_all": {}}}, _source=False
+        )
+    }
+    idea_ids = {str(pk) for pk in Idea.objects.values_list("pk", flat=True)}
+
+    queryset = document.get_queryset()
+    ideas = itertools.chain(
+        iterate_in_chunks(queryset.filter(modified__gte=since), chunk_size),
+        get_ideas_by_pks(queryset, idea_ids - indexed_ids, chunk_size),
+    )
+    stats = bulk_index_ideas(
+        ideas=ideas,
+        index_name=index_name,
+        using=using,
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+    )
+
+    stale_ids = indexed_ids - idea_ids
+    stats["deleted"] = 0
+    if stale_ids:
+        deleted_count, errors = bulk(
+            client,
+            generate_delete_actions(stale_ids, index_name),
+            raise_on_error=False,
+        )
+        stats["deleted"] = deleted_count
+        stats["errors"] += [
+            error for error in errors if error["delete"].get("status") != 404
+        ]
+        bump_search_generation(document._index._name)
+    client.indices.refresh(index=index_name)
+    return stats
+
+
+def generate_categories_update_actions(document, ideas, index_name=None):
+    index_name = index_name or document._index._name
+    for idea in ideas:
+        yield {
+            "_op_type": "update",
+            "_index": index_name,
+            "_id": str(idea.pk),
+            "doc": {"categories": document.prepare_categories(idea)},
+        }
+
+
+def update_idea_categories(idea_pks, chunk_size=RELATED_CHUNK_SIZE, using=None):
+    """
+    Rewrites only the nested categories of the indexed ideas, in chunks
+    of a bounded size. Returns the bulk errors.
+    """
+    document = IdeaDocument()
+    client = document._get_connection(using)
+    ideas = Idea.objects.prefetch_related(
+        models.Prefetch(
+            "categories", queryset=Category.objects.prefetch_related("translations")
+        )
+    )
+    errors = []
+    for start in range(0, len(idea_pks), chunk_size):
+        chunk = ideas.filter(pk__in=idea_pks[start:start + chunk_size])
+        success_count, chunk_errors = bulk(
+            client,
+            generate_categories_update_actions(document, chunk),
+            raise_on_error=False,
+        )
+        errors += chunk_errors
+    bump_search_generation(document._index._name)
+    return errors
+
+
+def enqueue_idea_categories_update(idea_pks):
+    IdeaCategoriesQueueItem.objects.bulk_create(
+        [IdeaCategoriesQueueItem(idea_uuid=pk) for pk in idea_pks]
+    )
+
+
+def get_queue_retry_delay(attempts):
+    return timedelta(
+        seconds=min(QUEUE_RETRY_DELAY * 2 ** (attempts - 1), QUEUE_MAX_RETRY_DELAY)
+    )
+
+
+def postpone_queue_items(items):
+    now = timezone_now()
+    attempts = {item.attempts + 1 for item in items}
+    for attempt in attempts:
+        IdeaCategoriesQueueItem.objects.filter(
+            pk__in=[item.pk for item in items if item.attempts + 1 == attempt]
+        ).update(attempts=attempt, next_attempt=now + get_queue_retry_delay(attempt))
+
+
+def process_idea_categories_queue(batch_size=RELATED_CHUNK_SIZE * 5):
+    """
+    Updates the categories of one batch of due queued ideas and returns
+    the number of updated ideas, or None if no items are due. Items of
+    ideas which failed are retried later with a growing delay, so that
+    they don't block the items behind them.
+    """
+    items = list(
+        IdeaCategoriesQueueItem.objects.filter(
+            next_attempt__lte=timezone_now()
+        ).order_by("next_attempt", "pk")[:batch_size]
+    )
+    if not items:
+        return None
+    idea_pks = list({item.idea_uuid for item in items})
+    errors = update_idea_categories(idea_pks)
+    failed_ids = {
+        error["update"]["_id"]
+        for error in errors
+        # ideas which aren't indexed get their categories with the document
+        if error["update"].get("status") != 404
+    }
+    failed_items = [item for item in items if str(item.idea_uuid) in failed_ids]
+    IdeaCategoriesQueueItem.objects.filter(
+        pk__in=[item.pk for item in items if str(item.idea_uuid) not in failed_ids]
+    ).delete()
+    if failed_items:
+        postpone_queue_items(failed_items)
+        logger.error(f"Updating the categories failed for {len(failed_ids)} ideas")
+    return len(idea_pks) - len(failed_ids)
+
+
+def generate_delete_actions(idea_uuids, index_name):
+    for idea_uuid in idea_uuids:
+        yield {"_op_type": "delete", "_index": index_name, "_id": str(idea_uuid)}
+
+
+def sync_idea_index(
+    using=None,
+    chunk_size=BULK_CHUNK_SIZE,
+    thread_count=BULK_THREAD_COUNT,
+    full=False,
+):
+    """
+    Indexes the ideas modified since the last sync and removes the
+    documents of ideas deleted since then. Changed translations count
+    as modified ideas. The watermark only moves when there were no
+    errors, so a failed run is repeated by the next one.
+    """
+    document = IdeaDocument()
+    index_name = document._index._name
+    watermark, created = IdeaIndexWatermark.objects.get_or_create(
+        index_name=index_name
+    )
+    started = timezone_now()
+    since = None
+    if watermark.synced_until and not full:
+        since = watermark.synced_until - timedelta(seconds=SYNC_OVERLAP)
+
+    ideas = document.get_queryset()
+    tombstones = IdeaTombstone.objects.all()
+    if since:
+        ideas = ideas.filter(modified__gt=since)
+        tombstones = tombstones.filter(deleted__gt=since)
+    stats = bulk_index_ideas(
+        ideas=iterate_in_chunks(ideas, chunk_size),
+        using=using,
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+    )
+
+    deleted_uuids = set(tombstones.values_list("idea_uuid", flat=True))
+    stats["deleted"] = 0
+    if deleted_uuids:
+        deleted_count, errors = bulk(
+            document._get_connection(using),
+            generate_delete_actions(deleted_uuids, index_name),
+            raise_on_error=False,
+        )
+        stats["deleted"] = deleted_count
+        # documents which were never indexed are fine
+        stats["errors"] += [
+            error for error in errors if error["delete"].get("status") != 404
+        ]
+        bump_search_generation(index_name)
+
+    if not stats["errors"]:
+        watermark.synced_until = started
+        watermark.save()
+        IdeaTombstone.objects.filter(
+            deleted__lte=started - timedelta(seconds=SYNC_OVERLAP)
+        ).delete()
+    return stats
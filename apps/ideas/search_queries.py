@@ -0,0 +1,168 @@
+import copy
+
+from django.conf import settings
+from elasticsearch_dsl.connections import get_connection
+from elasticsearch_dsl.query import Q
+from elasticsearch_dsl.response import Response
+
+# id of the stored search template, or None to send the full query;
+# store the template with "manage.py store_idea_search_template" first
+SEARCH_TEMPLATE_ID = getattr(settings, "IDEAS_SEARCH_TEMPLATE_ID", None)
+
+# Mustache source of the stored template. The lists are flagged
+# separately, because a section over a list repeats for every item.
+SEARCH_TEMPLATE_SOURCE = (
+    '{"query": {"bool": {'
+    '"must": {{#q}}{"multi_match": {"query": "{{q}}", "type": "phrase", '
+    '"fields": ["title_{{lang}}", "content_{{lang}}", "categories.title_{{lang}}"]}}'
+    '{{/q}}{{^q}}{"match_all": {}}{{/q}}, '
+    '"filter": ['
+    '{{#author}}{"term": {"author.pk": {{author}}}}, {{/author}}'
+    '{{#has_categories}}{"terms": {"categories.pk": {{#toJson}}categories{{/toJson}}}}, '
+    '{{/has_categories}}'
+    '{{#rating}}{"term": {"rating": {{rating}}}}, {{/rating}}'
+    '{"match_all": {}}]}}, '
+    '"size": {{size}}, "from": {{from}}, '
+    '{{#has_search_after}}"search_after": {{#toJson}}search_after{{/toJson}}, '
+    '{{/has_search_after}}'
+    '"sort": {{#toJson}}sort{{/toJson}}, '
+    '"_source": {{#toJson}}source{{/toJson}}, '
+    '"track_total_hits": true}'
+)
+
+
+def get_search_filters(selected):
+    """
+    Converts the selected facets of IdeaFilterForm to the values
+    which the documents store
+    """
+    filters = {}
+    if selected.get("author"):
+        filters["author"] = selected["author"].pk
+    if selected.get("category"):
+        filters["categories"] = [selected["category"].pk]
+    if selected.get("rating"):
+        filters["rating"] = int(selected["rating"])
+    return filters
+
+
+def build_idea_query(q, language, filters=None):
+    """
+    Returns one phrase query over the fields of the language and the
+    facets as filter clauses, which aren't scored and can be cached
+    """
+    lang_code_underscored = language.replace("-", "_")
+    filters = filters or {}
+    if q:
+        query = Q(
+            "multi_match",
+            query=q,
+            type="phrase",
+            fields=[
+                f"title_{lang_code_underscored}",
+                f"content_{lang_code_underscored}",
+                # copied to the root by include_in_root
+                f"categories.title_{lang_code_underscored}",
+            ],
+        )
+    else:
+        query = Q("match_all")
+    filter_clauses = []
+    if filters.get("author"):
+        filter_clauses.append(Q("term", **{"author.pk": filters["author"]}))
+    if filters.get("categories"):
+        filter_clauses.append(Q("terms", **{"categories.pk": filters["categories"]}))
+    if filters.get("rating"):
+        filter_clauses.append(Q("term", rating=filters["rating"]))
+    return Q("bool", must=[query], filter=filter_clauses)
+
+
+def build_legacy_idea_query(q, language):
+    # the query before build_idea_query(), kept for benchmarking
+    lang_code_underscored = language.replace("-", "_")
+    return (
+        Q("match_phrase", **{f"title_{lang_code_underscored}": q})
+        | Q("match_phrase", **{f"content_{lang_code_underscored}": q})
+        | Q(
+            "nested",
+            path="categories",
+            query=Q(
+                "match_phrase",
+                **{f"categories__title_{lang_code_underscored}": q},
+            ),
+        )
+    )
+
+
+def put_search_template(client, template_id=SEARCH_TEMPLATE_ID):
+    client.put_script(
+        id=template_id,
+        body={"script": {"lang": "mustache", "source": SEARCH_TEMPLATE_SOURCE}},
+    )
+
+
+class TemplatedIdeaSearch:
+    """
+    Sends only the id of the stored template and its parameters. Supports
+    the part of the Search API which the views and SearchPaginator use.
+    """
+
+    def __init__(self, search, template_id, q, language, filters=None):
+        self._search = search
+        self._template_id = template_id
+        filters = filters or {}
+        self._params = {
+            "q": q,
+            "lang": language.replace("-", "_"),
+            "author": filters.get("author"),
+            "has_categories": bool(filters.get("categories")),
+            "categories": filters.get("categories") or [],
+            "rating": filters.get("rating"),
+            "size": 10,
+            "from": 0,
+            "has_search_after": False,
+            "search_after": [],
+            "sort": ["_score"],
+            "source": True,
+        }
+
+    def _clone(self, **params):
+        clone = copy.copy(self)
+        clone._params = dict(self._params, **params)
+        return clone
+
+    def source(self, fields):
+        return self._clone(source=fields)
+
+    def sort(self, *keys):
+        return self._clone(sort=list(keys))
+
+    def extra(self, **kwargs):
+        params = {}
+        if "size" in kwargs:
+            params["size"] = kwargs["size"]
+        if "from_" in kwargs:
+            params["from"] = kwargs["from_"]
+        if "search_after" in kwargs:
+            params["has_search_after"] = True
+            params["search_after"] = list(kwargs["search_after"])
+        # track_total_hits is always on in the template
+        return self._clone(**params)
+
+    def execute(self):
+        client = get_connection(self._search._using)
+        raw_response = client.search_template(
+            index=self._search._index,
+            body={"id": self._template_id, "params": self._params},
+        )
+        return Response(self._search, raw_response)
+
+
+def get_idea_search(search, q, language, filters=None):
+    """
+    Returns the search for the query and the facets, using the stored
+    template if IDEAS_SEARCH_TEMPLATE_ID is set
+    """
+    if SEARCH_TEMPLATE_ID:
+        return TemplatedIdeaSearch(search, SEARCH_TEMPLATE_ID, q, language, filters)
+    return search.query(build_idea_query(q, language, filters))
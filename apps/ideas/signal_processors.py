@@ -0,0 +1,65 @@
+from django_elasticsearch_dsl.registries import registry
+from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
+
+from myproject.apps.categories.models import Category, CategoryTranslations
+from .search_cache import bump_search_generation
+
+
+def get_category_idea_pks(instance):
+    category = instance if isinstance(instance, Category) else instance.category
+    return list(category.category_ideas.values_list("pk", flat=True))
+
+
+def defer_categories_update(idea_pks):
+    from .search_indexing import enqueue_idea_categories_update
+
+    # stored in the same transaction; process_idea_categories_queue applies it
+    enqueue_idea_categories_update(idea_pks)
+
+
+def get_index_names(model):
+    return {
+        document._index._name
+        for document in registry.get_documents()
+        if model is document.django.model or model in document.django.related_models
+    }
+
+
+class GenerationSignalProcessor(RealTimeSignalProcessor):
+    """
+    Updates the documents in real time like the default processor and
+    bumps the search generation of the affected indices.
+    m2m changes are handled by handle_save() too. Changes of categories
+    queue their ideas for the process_idea_categories_queue command,
+    which updates only the nested categories.
+    """
+
+    def handle_save(self, sender, instance, **kwargs):
+        if isinstance(instance, (Category, CategoryTranslations)):
+            defer_categories_update(get_category_idea_pks(instance))
+            return
+        super().handle_save(sender, instance, **kwargs)
+        for index_name in get_index_names(instance.__class__):
+            bump_search_generation(index_name)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        super().handle_delete(sender, instance, **kwargs)
+        for index_name in get_index_names(instance.__class__):
+            bump_search_generation(index_name)
+
+    def handle_pre_delete(self, sender, instance, **kwargs):
+        if isinstance(instance, (Category, CategoryTranslations)):
+            # the ideas of a category have to be collected before it's gone
+            defer_categories_update(get_category_idea_pks(instance))
+            return
+        super().handle_pre_delete(sender, instance, **kwargs)
+
+    def handle_m2m_changed(self, sender, instance, action, **kwargs):
+        if isinstance(instance, Category):
+            # ideas removed from the category aren't in category_ideas anymore
+            if action in ("post_add", "post_remove") and kwargs.get("pk_set"):
+                defer_categories_update(kwargs["pk_set"])
+            elif action == "pre_clear":
+                defer_categories_update(get_category_idea_pks(instance))
+            return
+        super().handle_m2m_changed(sender, instance, action, **kwargs)
@@ -0,0 +1,229 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils.timezone import now as timezone_now
+
+from myproject.apps.categories.models import Category, CategoryTranslations
+from myproject.apps.core.page_cache import invalidate_tags
+from .facets import update_facet_count
+from .handouts import delete_handouts
+from .image_derivatives import schedule_idea_derivatives
+from .models import Idea, IdeaFacetCount, IdeaTombstone, IdeaTranslations
+
+IdeaCategories = Idea.categories.through
+
+
+@receiver(pre_save, sender=Idea)
+def remember_original_values(sender, instance, **kwargs):
+    instance._original_values = {}
+    if not instance._state.adding:
+        instance._original_values = (
+            sender.objects.filter(pk=instance.pk)
+            .values("author", "rating", "picture")
+            .first()
+            or {}
+        )
+
+
+@receiver(post_save, sender=Idea)
+def update_facet_counts_on_save(sender, instance, **kwargs):
+    original = getattr(instance, "_original_values", {})
+    for facet, attname in (("author", "author_id"), ("rating", "rating")):
+        old_value = original.get(facet)
+        new_value = getattr(instance, attname)
+        if old_value != new_value:
+            update_facet_count(facet, old_value, -1)
+            update_facet_count(facet, new_value, 1)
+
+
+@receiver(post_save, sender=Idea)
+def generate_uploaded_picture_derivatives(sender, instance, **kwargs):
+    original = getattr(instance, "_original_values", {})
+    if instance.picture and instance.picture.name != original.get("picture"):
+        idea_pk = instance.pk
+        transaction.on_commit(lambda: schedule_idea_derivatives(idea_pk))
+
+
+@receiver(pre_delete, sender=Idea)
+def remember_category_ids(sender, instance, **kwargs):
+    # the m2m rows are deleted by the cascade without m2m_changed
+    instance._original_category_ids = list(
+        IdeaCategories.objects.filter(idea=instance).values_list(
+            "category", flat=True
+        )
+    )
+
+
+@receiver(post_delete, sender=Idea)
+def update_facet_counts_on_delete(sender, instance, **kwargs):
+    update_facet_count("author", instance.author_id, -1)
+    update_facet_count("rating", instance.rating, -1)
+    for category_id in getattr(instance, "_original_category_ids", []):
+        update_facet_count("category", category_id, -1)
+
+
+@receiver(m2m_changed, sender=IdeaCategories)
+def update_category_facet_counts(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # category.category_ideas.add/remove/clear()
+        links = sender.objects.filter(category=instance)
+        if pk_set is not None:
+            links = links.filter(idea__in=pk_set)
+    else:
+        # idea.categories.add/remove/clear()
+        links = sender.objects.filter(idea=instance)
+        if pk_set is not None:
+            links = links.filter(category__in=pk_set)
+
+    if action in ("pre_remove", "pre_clear"):
+        # remember which of the links really exist before they are deleted
+        instance._removed_category_links = list(
+            links.values_list("category", flat=True)
+        )
+    elif action in ("post_remove", "post_clear"):
+        for category_id in getattr(instance, "_removed_category_links", []):
+            update_facet_count("category", category_id, -1)
+        instance._removed_category_links = []
+    elif action == "post_add":
+        # pk_set only contains the newly added links here
+        if reverse:
+            update_facet_count("category", instance.pk, len(pk_set))
+        else:
+            for category_id in pk_set:
+                update_facet_count("category", category_id, 1)
+
+
+@receiver(post_delete, sender=Category)
+def delete_category_facet_count(sender, instance, **kwargs):
+    IdeaFacetCount.objects.filter(facet="category", value=instance.pk).delete()
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def delete_author_facet_count(sender, instance, **kwargs):
+    IdeaFacetCount.objects.filter(facet="author", value=instance.pk).delete()
+
+
+def invalidate_tags_on_commit(*tags):
+    # before the commit, a concurrent request could still cache the old
+    # rows under the new tag versions
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+@receiver(post_save, sender=Idea)
+@receiver(post_delete, sender=Idea)
+def invalidate_idea_pages(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"idea:{instance.pk}", "list")
+
+
+@receiver(post_save, sender=IdeaTranslations)
+@receiver(post_delete, sender=IdeaTranslations)
+def invalidate_idea_translation_pages(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"idea:{instance.idea_id}", "list")
+
+
+@receiver(m2m_changed, sender=IdeaCategories)
+def invalidate_idea_category_pages(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        idea_tags = [f"idea:{pk}" for pk in pk_set or []]
+        invalidate_tags_on_commit(f"category:{instance.pk}", "list", *idea_tags)
+    else:
+        invalidate_tags_on_commit(f"idea:{instance.pk}", "list")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"category:{instance.pk}", "list")
+
+
+@receiver(post_save, sender=CategoryTranslations)
+@receiver(post_delete, sender=CategoryTranslations)
+def invalidate_category_translation_pages(sender, instance, **kwargs):
+    invalidate_tags_on_commit(f"category:{instance.category_id}", "list")
+
+
+@receiver(post_save, sender=IdeaTranslations)
+@receiver(post_delete, sender=IdeaTranslations)
+def touch_translated_idea(sender, instance, **kwargs):
+    # the translations are a part of the idea, so caches keyed by
+    # the idea's modification time have to be refreshed too
+    Idea.objects.filter(pk=instance.idea_id).update(modified=timezone_now())
+
+
+def touch_categorized_ideas(idea_pks):
+    # the handouts show the categories and are stored and validated by
+    # the idea's modification time
+    Idea.objects.filter(pk__in=idea_pks).update(modified=timezone_now())
+    for idea_pk in idea_pks:
+        delete_handouts(idea_pk)
+
+
+def get_category_idea_pks(category_pk):
+    return list(
+        IdeaCategories.objects.filter(category=category_pk).values_list(
+            "idea", flat=True
+        )
+    )
+
+
+@receiver(m2m_changed, sender=IdeaCategories)
+def touch_ideas_with_changed_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == "pre_clear":
+        instance._cleared_idea_pks = get_category_idea_pks(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        touch_categorized_ideas(list(pk_set) if reverse else [instance.pk])
+    elif action == "post_clear":
+        if reverse:
+            touch_categorized_ideas(getattr(instance, "_cleared_idea_pks", []))
+        else:
+            touch_categorized_ideas([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def touch_ideas_of_changed_category(sender, instance, created, **kwargs):
+    if not created:
+        touch_categorized_ideas(get_category_idea_pks(instance.pk))
+
+
+@receiver(post_save, sender=CategoryTranslations)
+@receiver(post_delete, sender=CategoryTranslations)
+def touch_ideas_of_translated_category(sender, instance, **kwargs):
+    touch_categorized_ideas(get_category_idea_pks(instance.category_id))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_idea_pks(sender, instance, **kwargs):
+    # the m2m rows are deleted by the cascade without m2m_changed
+    instance._original_idea_pks = get_category_idea_pks(instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def touch_ideas_of_deleted_category(sender, instance, **kwargs):
+    touch_categorized_ideas(getattr(instance, "_original_idea_pks", []))
+
+
+@receiver(post_save, sender=Idea)
+@receiver(post_delete, sender=Idea)
+def delete_idea_handouts(sender, instance, **kwargs):
+    delete_handouts(instance.pk)
+
+
+@receiver(post_save, sender=IdeaTranslations)
+@receiver(post_delete, sender=IdeaTranslations)
+def delete_translated_idea_handouts(sender, instance, **kwargs):
+    delete_handouts(instance.idea_id)
+
+
+@receiver(post_delete, sender=Idea)
+def add_idea_tombstone(sender, instance, **kwargs):
+    # lets sync_idea_index remove the document of a deleted idea
+    IdeaTombstone.objects.create(idea_uuid=instance.pk)
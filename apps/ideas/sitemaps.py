@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap
+from django.utils.functional import cached_property
+
+from .models import Idea, get_idea_url_path
+
+
+class TranslatedItems:
+    """
+    A sliceable sequence of (pk, modified, lang_code) for each row of
+    the queryset and each language. Slicing reads only the rows of the
+    slice, so the sitemap paginator doesn't load all ideas.
+    """
+
+    def __init__(self, queryset, languages):
+        self.queryset = queryset
+        self.languages = [lang_code for lang_code, lang_name in languages]
+
+    @cached_property
+    def row_count(self):
+        return self.queryset.count()
+
+    def __len__(self):
+        return self.row_count * len(self.languages)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self)
+            items = self[index:index + 1]
+            if not items:
+                raise IndexError(index)
+            return items[0]
+        start, stop, step = index.indices(len(self))
+        language_count = len(self.languages)
+        first_row = start // language_count
+        rows = self.queryset[first_row:-(-stop // language_count)]
+        items = [
+            (pk, modified, lang_code)
+            for pk, modified in rows
+            for lang_code in self.languages
+        ]
+        offset = first_row * language_count
+        return items[start - offset:stop - offset:step]
+
+
+class IdeaSitemap(Sitemap):
+    changefreq = "weekly"
+
+    def items(self):
+        return TranslatedItems(
+            Idea.objects.order_by("pk").values_list("pk", "modified"),
+            settings.LANGUAGES,
+        )
+
+    def location(self, item):
+        pk, modified, lang_code = item
+        return get_idea_url_path(pk, lang_code)
+
+    def lastmod(self, item):
+        pk, modified, lang_code = item
+        return modified
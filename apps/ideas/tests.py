@@ -1,3 +1,191 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import translation
 
-# Create your tests here.
+from myproject.apps.categories.models import Category
+from myproject.apps.core.page_cache import (
+    get_canonical_query_string,
+    get_page_cache_key,
+)
+from myproject.apps.core.pagination import (
+    InvalidCursor,
+    KeysetPaginator,
+    SearchPaginator,
+    decode_cursor,
+    encode_cursor,
+)
+from .facets import count_facets
+from .models import Idea
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for title in ["A", "B", "C", "D", "E"]:
+            Idea.objects.create(title=title, content=title)
+
+    def get_paginator(self):
+        return KeysetPaginator(
+            Idea.objects.all(), per_page=2, ordering=("title", "uuid")
+        )
+
+    def get_titles(self, page):
+        return [idea.title for idea in page]
+
+    def test_forward_to_the_last_page(self):
+        paginator = self.get_paginator()
+        first_page = paginator.page()
+        self.assertEqual(self.get_titles(first_page), ["A", "B"])
+        self.assertFalse(first_page.has_previous())
+        self.assertTrue(first_page.has_next())
+
+        second_page = paginator.page(first_page.next_cursor)
+        self.assertEqual(self.get_titles(second_page), ["C", "D"])
+        self.assertTrue(second_page.has_previous())
+        self.assertTrue(second_page.has_next())
+
+        last_page = paginator.page(second_page.next_cursor)
+        self.assertEqual(self.get_titles(last_page), ["E"])
+        self.assertTrue(last_page.has_previous())
+        self.assertFalse(last_page.has_next())
+        self.assertIsNone(last_page.next_cursor)
+
+    def test_back_to_the_first_page(self):
+        paginator = self.get_paginator()
+        second_page = paginator.page(paginator.page().next_cursor)
+        last_page = paginator.page(second_page.next_cursor)
+
+        page = paginator.page(last_page.previous_cursor)
+        self.assertEqual(self.get_titles(page), ["C", "D"])
+        self.assertTrue(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        first_page = paginator.page(page.previous_cursor)
+        self.assertEqual(self.get_titles(first_page), ["A", "B"])
+        self.assertFalse(first_page.has_previous())
+        self.assertIsNone(first_page.previous_cursor)
+        self.assertTrue(first_page.has_next())
+
+    def test_malformed_cursors(self):
+        paginator = self.get_paginator()
+        for cursor in [
+            "not a cursor!",
+            encode_cursor(["n"])[:-2],
+            encode_cursor(["x", "A", "00000000-0000-0000-0000-000000000000"]),
+            encode_cursor(["n", "A"]),
+            encode_cursor(["n", "A", "not-a-uuid"]),
+            encode_cursor(["n", 1, "00000000-0000-0000-0000-000000000000"]),
+            encode_cursor(["n", ["A"], "00000000-0000-0000-0000-000000000000"]),
+        ]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(cursor)
+
+
+class CursorEncodingTests(SimpleTestCase):
+    def test_round_trip(self):
+        values = ["n", "Ärger & Co", "42"]
+        self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+    def test_invalid_cursors(self):
+        for cursor in ["%%%", encode_cursor({"n": 1}), encode_cursor(["n"])]:
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+
+class SearchCursorTests(SimpleTestCase):
+    def test_invalid_search_after_values(self):
+        # rejected before the search is executed
+        paginator = SearchPaginator(None, per_page=2, sort=("_score", "uuid"))
+        for values in [
+            [2, "high", "00000000-0000-0000-0000-000000000000"],
+            [2, 1.5, None],
+            [2, 1.5, {"uuid": "00000000-0000-0000-0000-000000000000"}],
+            [2, True, "00000000-0000-0000-0000-000000000000"],
+            [2, 1.5],
+            ["2", 1.5, "00000000-0000-0000-0000-000000000000"],
+            [0, 1.5, "00000000-0000-0000-0000-000000000000"],
+        ]:
+            with self.subTest(values=values):
+                with self.assertRaises(InvalidCursor):
+                    paginator.page(cursor=encode_cursor(values))
+
+
+@override_settings(ELASTICSEARCH_DSL_AUTOSYNC=False)
+class FacetCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.author1 = User.objects.create_user(username="author1")
+        cls.author2 = User.objects.create_user(username="author2")
+        cls.category1 = Category.objects.create(title="Category 1")
+        cls.category2 = Category.objects.create(title="Category 2")
+        for author, rating, categories in [
+            (cls.author1, 5, [cls.category1]),
+            (cls.author1, 3, [cls.category1, cls.category2]),
+            (cls.author2, 5, [cls.category2]),
+        ]:
+            idea = Idea.objects.create(
+                title="Idea", content="Idea", author=author, rating=rating
+            )
+            idea.categories.set(categories)
+
+    def test_without_selection(self):
+        self.assertEqual(
+            count_facets({}),
+            {
+                "author": {self.author1.pk: 2, self.author2.pk: 1},
+                "category": {self.category1.pk: 2, self.category2.pk: 2},
+                "rating": {5: 2, 3: 1},
+            },
+        )
+
+    def test_with_selected_author(self):
+        self.assertEqual(
+            count_facets({"author": self.author1.pk}),
+            {
+                # a facet isn't filtered by its own selection
+                "author": {self.author1.pk: 2, self.author2.pk: 1},
+                "category": {self.category1.pk: 2, self.category2.pk: 1},
+                "rating": {5: 1, 3: 1},
+            },
+        )
+
+    def test_with_selected_category(self):
+        self.assertEqual(
+            count_facets({"category": self.category2.pk}),
+            {
+                "author": {self.author1.pk: 1, self.author2.pk: 1},
+                "category": {self.category1.pk: 2, self.category2.pk: 2},
+                "rating": {5: 1, 3: 1},
+            },
+        )
+
+
+class PageCacheKeyTests(SimpleTestCase):
+    def get_key(self, path):
+        with translation.override("en"):
+            return get_page_cache_key(RequestFactory().get(path))
+
+    def test_parameter_order_is_ignored(self):
+        self.assertEqual(
+            self.get_key("/en/ideas/?rating=3&author=1"),
+            self.get_key("/en/ideas/?author=1&rating=3"),
+        )
+        self.assertEqual(
+            get_canonical_query_string(QueryDict("b=2&a=1&b=1")),
+            get_canonical_query_string(QueryDict("a=1&b=2&b=1")),
+        )
+
+    def test_different_pages_get_different_keys(self):
+        self.assertNotEqual(
+            self.get_key("/en/ideas/?rating=3"),
+            self.get_key("/en/ideas/?rating=4"),
+        )
+        self.assertNotEqual(
+            self.get_key("/en/ideas/?rating=3"),
+            self.get_key("/en/search/?rating=3"),
+        )
@@ -8,62 +8,110 @@ from django.forms import modelformset_factory
 from django.conf import settings
 from .forms import IdeaForm, IdeaTranslationsForm, IdeaFilterForm, IdeaSearchForm
 from .models import Idea, IdeaTranslations, RATING_CHOICES
-from django.core.paginator import EmptyPage, PageNotAnInteger, Pagin
+from .cards import get_document_card_context, render_idea_cards
+from .handouts import (
+    get_handout_etag,
+    get_handout_name,
+    get_stored_handout,
+    store_handout,
+)
+from .pdf_rendering import HandoutRenderError, render_handout_pdf
+from .search_cache import get_search_page, get_search_page_tag
+from .search_queries import get_idea_search, get_search_filters
+from .facets import (
+    FACET_FILTERS,
+    filter_by_facets,
+    get_facet_categories,
+    get_selected_facets,
+)
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.utils.decorators import method_decorator
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+from myproject.apps.core.page_cache import cache_page_with_tags, record_tag_versions
+from myproject.apps.core.pagination import InvalidCursor, KeysetPaginator
 
 PAGE_SIZE = getattr(settings, "PAGE_SIZE", 24)
+# "pages" for numbered pages or "cursor" for keyset pagination
+PAGINATION_MODE = getattr(settings, "IDEAS_PAGINATION_MODE", "pages")
+KEYSET_ORDERING = ("title", "uuid")
+SEARCH_SORTING = ("_score", "uuid")
+
+def get_idea_list_tags(request, *args, **kwargs):
+    return ["list"]
+
+
+def get_idea_search_tags(request, *args, **kwargs):
+    from .documents import IdeaDocument
+
+    # bumped with the search generation, e.g. after a reindex
+    return ["list", get_search_page_tag(IdeaDocument._index._name)]
+
+
+def get_idea_detail_tags(request, *args, **kwargs):
+    # the category tags are recorded by IdeaDetail.get_object()
+    return [f"idea:{kwargs['pk']}"]
+
 
 class IdeaList(ListView):
     model = Idea
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["cards"] = render_idea_cards(context["object_list"])
+        return context
+
+@method_decorator(cache_page_with_tags(get_idea_detail_tags), name="dispatch")
 class IdeaDetail(DetailView):
     model = Idea
     context_object_name = "idea"
 
+    def get_queryset(self):
+        return super().get_queryset().with_translations().with_categories()
+
+    def get_object(self, queryset=None):
+        idea = super().get_object(queryset)
+        record_tag_versions(
+            self.request,
+            [f"category:{category.pk}" for category in idea.categories.all()],
+        )
+        return idea
+
+@method_decorator(cache_page_with_tags(get_idea_list_tags), name="dispatch")
 class IdeaListView(View):
     form_class = IdeaFilterForm
     template_name = "ideas/idea_list.html"
+    pagination_mode = PAGINATION_MODE
 
     def get(self, request, *args, **kwargs):
         form = self.form_class(data=request.GET)
         qs, facets = self.get_queryset_and_facets(form)
         page = self.get_page(request, qs)
-        context = {"form": form, "facets": facets, "object_list": page}
+        context = {
+            "form": form,
+            "facets": facets,
+            "object_list": page,
+            "cards": render_idea_cards(page),
+        }
         return render(request, self.template_name, context)
 
     def get_queryset_and_facets(self, form):
         qs = Idea.objects.order_by("title")
-        facets = {
-            "selected": {},
-            "categories": {
-                "authors": form.fields["author"].queryset,
-                "categories": form.fields["category"].queryset,
-                "ratings": RATING_CHOICES,
-            },
-        }
+        facets = {"selected": {}}
+        selected = {}
         if form.is_valid():
-            filters = (
-                ("author", "author"),
-                ("category", "categories"),
-                ("rating", "rating"),
-            )
-            qs = self.filter_facets(facets, qs, form, filters)
+            selected = get_selected_facets(form)
+            qs = self.filter_facets(facets, qs, form, FACET_FILTERS)
+        facets["categories"] = get_facet_categories(selected)
         return qs, facets
 
     @staticmethod
     def filter_facets(facets, qs, form, filters):
-        for query_param, filter_param in filters:
-            value = form.cleaned_data[query_param]
-            if value:
-                selected_value = value
-                if query_param == "rating":
-                    rating = int(value)
-                    selected_value = (rating, dict(RATING_CHOICES)[rating])
-                facets["selected"][query_param] = selected_value
-                filter_args = {filter_param: value}
-                qs = qs.filter(**filter_args).distinct()
-        return qs
+        return filter_facets(facets, qs, form, filters)
 
     def get_page(self, request, qs):
+        if self.pagination_mode == "cursor":
+            return get_keyset_page(request, qs)
         paginator = Paginator(qs, PAGE_SIZE)
         page_number = request.GET.get("page")
         try:
@@ -77,48 +125,37 @@ class IdeaListView(View):
 	
 class = IdeaFilterForm
     template_name = "ideas/idea_list.html"
+    pagination_mode = PAGINATION_MODE
 
     def get(self, request, *args, **kwargs):
         form = self.form_class(data=request.GET)
         qs, facets = self.get_queryset_and_facets(form)
         page = self.get_page(request, qs)
-        context = {"form": form, "facets": facets, "object_list": page}
+        context = {
+            "form": form,
+            "facets": facets,
+            "object_list": page,
+            "cards": render_idea_cards(page),
+        }
         return render(request, self.template_name, context)
 
     def get_queryset_and_facets(self, form):
         qs = Idea.objects.order_by("title")
-        facets = {
-            "selected": {},
-            "categories": {
-                "authors": form.fields["author"].queryset,
-                "categories": form.fields["category"].queryset,
-                "ratings": RATING_CHOICES,
-            },
-        }
+        facets = {"selected": {}}
+        selected = {}
         if form.is_valid():
-            filters = (
-                ("author", "author"),
-                ("category", "categories"),
-                ("rating", "rating"),
-            )
-            qs = self.filter_facets(facets, qs, form, filters)
+            selected = get_selected_facets(form)
+            qs = self.filter_facets(facets, qs, form, FACET_FILTERS)
+        facets["categories"] = get_facet_categories(selected)
         return qs, facets
 
     @staticmethod
     def filter_facets(facets, qs, form, filters):
-        for query_param, filter_param in filters:
-            value = form.cleaned_data[query_param]
-            if value:
-                selected_value = value
-                if query_param == "rating":
-                    rating = int(value)
-                    selected_value = (rating, dict(RATING_CHOICES)[rating])
-                facets["selected"][query_param] = selected_value
-                filter_args = {filter_param: value}
-                qs = qs.filter(**filter_args).distinct()
-        return qs
+        return filter_facets(facets, qs, form, filters)
 
     def get_page(self, request, qs):
+        if self.pagination_mode == "cursor":
+            return get_keyset_page(request, qs)
         paginator = Paginator(qs, PAGE_SIZE)
         page_number = request.GET.get("page")
         try:
@@ -129,66 +166,85 @@ class = IdeaFilterForm
             page = paginator.page(paginator.num_pages)
         return page
 
-class SearchResults(LazyObject):
-    def __init__(self, search_object):
-        self._wrapped = search_object
+def get_keyset_page(request, qs):
+    paginator = KeysetPaginator(qs, PAGE_SIZE, ordering=KEYSET_ORDERING)
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        page = paginator.page()
+    return page
 
-    def __len__(self):
-        return self._wrapped.count()
 
-    def __getitem__(self, index):
-        search_results = self._wrapped[index]
-        if isinstance(index, slice):
-            search_results = list(search_results)
-        return search_results
+def get_handout_modified(request, pk):
+    if not hasattr(request, "_handout_modified"):
+        request._handout_modified = (
+            Idea.objects.filter(pk=pk).values_list("modified", flat=True).first()
+        )
+    return request._handout_modified
+
+
+def get_handout_etag_for_request(request, pk):
+    modified = get_handout_modified(request, pk)
+    if modified is None:
+        return None
+    return get_handout_etag(pk, get_language(), modified)
 
-def idea_handout_pdf(request, pk):
+
+@condition(
+    etag_func=get_handout_etag_for_request,
+    last_modified_func=get_handout_modified,
+)
+def conditional_idea_handout_pdf(request, pk):
 
     from django.template.loader import render_to_string
     from django.utils.timezone import now as timezone_now
     from django.utils.text import slugify
     from django.http import HttpResponse
 
-    from weasyprint import HTML
-    from weasyprint.fonts import FontConfiguration
-
-    idea = get_object_or_404(Idea, pk=pk)
-    context = {"idea": idea}
-    html = render_to_string("ideas/idea_handout_pdf.html", context)
-
-    response = HttpResponse(content_type="application/pdf")
+    idea = get_object_or_404(
+        Idea.objects.with_translations().with_categories(), pk=pk
+    )
+    handout_name = get_handout_name(idea.pk, get_language(), idea.modified)
+    pdf = get_stored_handout(handout_name)
+    if pdf is None:
+        context = {"idea": idea, "preloaded_stylesheets": True}
+        html = render_to_string("ideas/idea_handout_pdf.html", context)
+        pdf = render_handout_pdf(html)
+        store_handout(handout_name, pdf)
+
+    response = HttpResponse(pdf, content_type="application/pdf")
     response[
         "Content-Disposition"
     ] = "inline; filename={date}-{name}-handout.pdf".format(
         date=timezone_now().strftime("%Y-%m-%d"), name=slugify(idea.translated_title)
     )
 
-    font_config = FontConfiguration()
-    HTML(string=html).write_pdf(response, font_config=font_config)
-
     return response
 
 
+def idea_handout_pdf(request, pk):
+    from django.http import HttpResponse
+
+    try:
+        return conditional_idea_handout_pdf(request, pk)
+    except HandoutRenderError:
+        # returned outside of @condition, which would add the ETag and
+        # Last-Modified of the handout to the error
+        response = HttpResponse(status=503)
+        response["Retry-After"] = 30
+        return response
+
+
 def idea_list(request):
     qs = Idea.objects.order_by("title")
     form = IdeaFilterForm(data=request.GET)
 
-    facets = {
-        "selected": {},
-        "categories": {
-            "authors": form.fields["author"].queryset,
-            "categories": form.fields["category"].queryset,
-            "ratings": RATING_CHOICES,
-        },
-    }
-
+    facets = {"selected": {}}
+    selected = {}
     if form.is_valid():
-        filters = (
-            ("author", "author"),
-            ("category", "categories"),
-            ("rating", "rating"),
-        )
-        qs = filter_facets(facets, qs, form, filters)
+        selected = get_selected_facets(form)
+        qs = filter_facets(facets, qs, form, FACET_FILTERS)
+    facets["categories"] = get_facet_categories(selected)
 
     if settings.DEBUG:
         import logging
@@ -196,53 +252,59 @@ def idea_list(request):
         logger = logging.getLogger(__name__)
         logger.info(facets)
 
-    paginator = Paginator(qs, PAGE_SIZE)
-    page_number = request.GET.get("page")
-    try:
-        page = paginator.page(page_number)
-    except PageNotAnInteger:
-        page = paginator.page(1)
-    except EmptyPage:
-        page = paginator.page(paginator.num_pages)
+    if PAGINATION_MODE == "cursor":
+        page = get_keyset_page(request, qs)
+    else:
+        paginator = Paginator(qs, PAGE_SIZE)
+        page_number = request.GET.get("page")
+        try:
+            page = paginator.page(page_number)
+        except PageNotAnInteger:
+            page = paginator.page(1)
+        except EmptyPage:
+            page = paginator.page(paginator.num_pages)
 
-    context = {"form": form, "facets": facets, "object_list": page}
+    context = {
+        "form": form,
+        "facets": facets,
+        "object_list": page,
+        "cards": render_idea_cards(page),
+    }
     return render(request, "ideas/idea_list.html", context)
 
+@cache_page_with_tags(get_idea_search_tags)
 def search_with_elasticsearch(request):
     from .documents import IdeaDocument
-    from elasticsearch_dsl.query import Q
     form = IdeaSearchForm(request, data=request.GET)
-    search = IdeaDocument.search()
-    if form.is_valid():
-        value = form.cleaned_data["q"]
-        lang_code_underscored = request.LANGUAGE_CODE.replace("-", "_")
-        search = search.query(
-            Q("match_phrase", **{f"title_{lang_code_underscored}": value})
-            | Q("match_phrase", **{f"content_{lang_code_underscored}": value})
-            | Q(
-                "nested",
-                path="categories",
-                query=Q(
-                    "match_phrase",
-                    **{f"categories__title_{lang_code_underscored}": value},
-                ),
-            )
-        )
-    search_results = SearchResults(search)
-
-    paginator = Paginator(search_results, PAGE_SIZE)
-    page_number = request.GET.get("page")
-    try:
-        page = paginator.page(page_number)
-    except PageNotAnInteger:
-        page = paginator.page(1)
-    except EmptyPage:
-        page = paginator.page(paginator.num_pages)
+    q = form.cleaned_data["q"] if form.is_valid() else ""
+    filter_form = IdeaFilterForm(data=request.GET)
+    filters = {}
+    if filter_form.is_valid():
+        filters = get_search_filters(get_selected_facets(filter_form))
+    search = get_idea_search(
+        IdeaDocument.search(), q, request.LANGUAGE_CODE, filters
+    ).source(IdeaDocument.get_display_fields(request.LANGUAGE_CODE))
+    page = get_search_page(
+        search,
+        index_name=IdeaDocument._index._name,
+        language=request.LANGUAGE_CODE,
+        q=q,
+        number=request.GET.get("page"),
+        cursor=request.GET.get("cursor"),
+        per_page=PAGE_SIZE,
+        sort=SEARCH_SORTING,
+        filters=filters,
+    )
 
-    context = {"form": form, "object_list": page}
+    context = {
+        "form": form,
+        "object_list": page,
+        "cards": render_idea_cards(page, get_document_card_context),
+    }
     return render(request, "ideas/idea_search.html", context)
 	
 def filter_facets(facets, qs, form, filters):
+    selected = {}
     for query_param, filter_param in filters:
         value = form.cleaned_data[query_param]
         if value:
@@ -251,9 +313,8 @@ def filter_facets(facets, qs, form, filters):
                 rating = int(value)
                 selected_value = (rating, dict(RATING_CHOICES)[rating])
             facets["selected"][query_param] = selected_value
-            filter_args = {filter_param: value}
-            qs = qs.filter(**filter_args).distinct()
-    return qs
+            selected[query_param] = value
+    return filter_by_facets(qs, selected, filters)
 	
 @login_required
 def add_or_change_idea(request, pk=None):
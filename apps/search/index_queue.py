@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.utils.timezone import now as timezone_now
+from haystack import connections
+
+from .models import IndexQueueItem
+
+# edits younger than that are left in the queue to be merged with later ones
+QUEUE_DELAY = getattr(settings, "HAYSTACK_QUEUE_DELAY", 5)
+QUEUE_BATCH_SIZE = getattr(settings, "HAYSTACK_QUEUE_BATCH_SIZE", 500)
+
+
+def enqueue(model, pks, action=IndexQueueItem.UPDATE):
+    IndexQueueItem.objects.bulk_create(
+        [
+            IndexQueueItem(
+                model_label=model._meta.label, object_pk=str(pk), action=action
+            )
+            for pk in pks
+        ]
+    )
+
+
+def get_identifier(model, pk):
+    return f"{model._meta.app_label}.{model._meta.model_name}.{pk}"
+
+
+def process_index_queue(batch_size=QUEUE_BATCH_SIZE, delay=QUEUE_DELAY):
+    """
+    Applies one batch of queued index changes and returns the number of
+    updated and removed objects, or None if nothing was due. The last
+    queued action of an object wins, and all updates and all removals of
+    a model are written with one commit per language each.
+    """
+    cutoff = timezone_now() - timedelta(seconds=delay)
+    items = list(IndexQueueItem.objects.filter(created__lte=cutoff)[:batch_size])
+    if not items:
+        return None
+
+    actions = {}
+    for item in items:
+        actions[(item.model_label, item.object_pk)] = item.action
+
+    connection = connections["default"]
+    backend = connection.get_backend()
+    unified_index = connection.get_unified_index()
+    updated_count = removed_count = 0
+    for model_label in {model_label for model_label, object_pk in actions}:
+        model = apps.get_model(model_label)
+        index = unified_index.get_index(model)
+        update_pks = {
+            object_pk
+            for (label, object_pk), action in actions.items()
+            if label == model_label and action == IndexQueueItem.UPDATE
+        }
+        remove_pks = {
+            object_pk
+            for (label, object_pk), action in actions.items()
+            if label == model_label and action == IndexQueueItem.DELETE
+        }
+        if update_pks:
+            # only the keys; the objects are loaded where they are indexed
+            existing_pks = [
+                str(pk)
+                for pk in index.index_queryset(using="default")
+                .filter(pk__in=update_pks)
+                .prefetch_related(None)
+                .values_list("pk", flat=True)
+            ]
+            if existing_pks:
+                backend.update_pks(index, existing_pks)
+                updated_count += len(existing_pks)
+            # deleted meanwhile or excluded by index_queryset()
+            remove_pks |= update_pks - set(existing_pks)
+        if remove_pks:
+            backend.remove_many([get_identifier(model, pk) for pk in remove_pks])
+            removed_count += len(remove_pks)
+
+    IndexQueueItem.objects.filter(pk__in=[item.pk for item in items]).delete()
+    return updated_count, removed_count
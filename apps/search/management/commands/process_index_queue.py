@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from myproject.apps.search.index_queue import (
+    QUEUE_BATCH_SIZE,
+    QUEUE_DELAY,
+    process_index_queue,
+)
+
+
+class Command(BaseCommand):
+    help = "Applies the queued search index changes in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=QUEUE_BATCH_SIZE)
+        parser.add_argument(
+            "--delay",
+            type=int,
+            default=QUEUE_DELAY,
+            help="Seconds to wait for more edits of the same objects",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting when it's empty",
+        )
+        parser.add_argument("--interval", type=float, default=2.0)
+
+    def handle(self, *args, **options):
+        while True:
+            result = process_index_queue(
+                batch_size=options["batch_size"], delay=options["delay"]
+            )
+            if result is not None:
+                updated_count, removed_count = result
+                self.stdout.write(
+                    f"Updated {updated_count} and removed {removed_count} objects."
+                )
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,29 @@
+# Generated by Django 3.0.14 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexQueueItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(max_length=100, verbose_name='Model')),
+                ('object_pk', models.CharField(max_length=40, verbose_name='Object ID')),
+                ('action', models.CharField(choices=[('update', 'Update'), ('delete', 'Delete')], max_length=10, verbose_name='Action')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Index Queue Item',
+                'verbose_name_plural': 'Index Queue Items',
+                'ordering': ['pk'],
+            },
+        ),
+    ]
@@ -1,3 +1,23 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class IndexQueueItem(models.Model):
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTION_CHOICES = (
+        (UPDATE, _("Update")),
+        (DELETE, _("Delete")),
+    )
+    model_label = models.CharField(_("Model"), max_length=100)
+    object_pk = models.CharField(_("Object ID"), max_length=40)
+    action = models.CharField(_("Action"), max_length=10, choices=ACTION_CHOICES)
+    created = models.DateTimeField(_("Created"), auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _("Index Queue Item")
+        verbose_name_plural = _("Index Queue Items")
+        ordering = ["pk"]
+
+    def __str__(self):
+        return f"{self.action} {self.model_label} {self.object_pk}"
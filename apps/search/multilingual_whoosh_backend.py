@@ -1,3 +1,10 @@
+import logging
+import resource
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures.process import BrokenProcessPool
+
 from django.conf import settings
 from django.utils import translation
 from haystack.backends.whoosh_backend import (
@@ -6,24 +13,278 @@ from haystack.backends.whoosh_backend import (
     WhooshEngine,
 )
 from haystack import connections
-from haystack.constants import DEFAULT_ALIAS
+from haystack.constants import DEFAULT_ALIAS, ID
+from haystack.utils import get_identifier
+from whoosh.writing import AsyncWriter
+
+from myproject.apps.core.process_pools import (
+    discard_process_pool,
+    get_process_pool,
+    init_django_worker,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCHER_POOL_SIZE = getattr(settings, "HAYSTACK_SEARCHER_POOL_SIZE", 8)
+UPDATE_POOL_NAME = "haystack_update"
+# None uses a worker per CPU, 0 updates the language indices one by one
+UPDATE_WORKERS = getattr(settings, "HAYSTACK_UPDATE_WORKERS", None)
+
+
+def get_update_pool():
+    return get_process_pool(
+        UPDATE_POOL_NAME,
+        max_workers=UPDATE_WORKERS,
+        initializer=init_django_worker,
+    )
+
+
+def get_peak_memory():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def update_language_index(using, lang_code, model_label, pks, commit):
+    """
+    Runs in a worker process: loads the batch in the language of the
+    index and writes it, so that each language uses its own core.
+    Returns the number of rows and the peak memory of the worker in MB.
+    """
+    from django.apps import apps
+
+    model = apps.get_model(model_label)
+    connection = connections[using]
+    index = connection.get_unified_index().get_index(model)
+    with translation.override(lang_code):
+        iterable = index.index_queryset(using=using).filter(pk__in=pks)
+        connection.get_backend().update(
+            index, iterable, commit, language_specific=True
+        )
+    return len(pks), get_peak_memory()
+
+
+class SearcherPool:
+    """
+    Idle Whoosh searchers per index path, shared by the threads of the
+    process. A searcher is used by one thread at a time and is refreshed
+    on checkout only if the index generation changed, reusing the readers
+    of the unchanged segments.
+    """
+
+    def __init__(self, max_size=SEARCHER_POOL_SIZE):
+        self.max_size = max_size
+        self.idle = defaultdict(list)
+        self.lock = threading.Lock()
+
+    def checkout(self, key, index):
+        with self.lock:
+            idle = self.idle[key]
+            searcher = idle.pop() if idle else None
+        if searcher is None:
+            return index.searcher()
+        if not searcher.up_to_date():
+            searcher = searcher.refresh()
+        return searcher
+
+    def checkin(self, key, searcher):
+        with self.lock:
+            idle = self.idle[key]
+            if len(idle) < self.max_size:
+                idle.append(searcher)
+                return
+        searcher.close()
+
+
+searcher_pool = SearcherPool()
+
+
+class PooledSearcher:
+    def __init__(self, searcher, key):
+        self._searcher = searcher
+        self._key = key
+        self._closed = False
+
+    def __getattr__(self, name):
+        return getattr(self._searcher, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        # returns the searcher to the pool instead of closing its files
+        if not self._closed:
+            self._closed = True
+            searcher_pool.checkin(self._key, self._searcher)
+
+
+class PooledSearcherIndex:
+    """
+    Wraps the Whoosh index of a backend so that the searchers which
+    Haystack opens and closes for every query come from the pool
+    """
+
+    def __init__(self, index, key):
+        self._index = index
+        self._key = key
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+    def refresh(self):
+        # the pooled searchers check the generation themselves
+        return self
+
+    def searcher(self, **kwargs):
+        if kwargs:
+            return self._index.searcher(**kwargs)
+        return PooledSearcher(searcher_pool.checkout(self._key, self._index), self._key)
+
+
+def log_update_stats(index, row_count, seconds, workers_memory=None):
+    rows_per_second = row_count / seconds if seconds else 0
+    message = (
+        f"Indexed {row_count} {index.get_model()._meta.verbose_name_plural} "
+        f"in {len(settings.LANGUAGES)} languages in {seconds:.2f} s "
+        f"({rows_per_second:.1f} rows/s), peak memory {get_peak_memory():.1f} MB"
+    )
+    if workers_memory is not None:
+        # the largest peak among the workers which wrote this batch
+        message += f", workers {workers_memory:.1f} MB"
+    logger.info(message)
 
 
 class MultilingualWhooshSearchBackend(WhooshSearchBackend):
+    def setup(self):
+        super().setup()
+        self.index = PooledSearcherIndex(self.index, self.path)
+
     def update(self, index, iterable, commit=True, language_specific=False):
         if not language_specific and self.connection_alias == "default":
-            current_language = (translation.get_language() or settings.LANGUAGE_CODE)[
-                :2
-            ]
+            start = time.perf_counter()
+            workers_memory = None
+            try:
+                if UPDATE_WORKERS == 0:
+                    row_count = self.update_sequentially(index, iterable, commit)
+                else:
+                    row_count, workers_memory = self.update_in_parallel(
+                        index, iterable, commit
+                    )
+            except BrokenProcessPool:
+                discard_process_pool(UPDATE_POOL_NAME)
+                logger.warning("The index update pool broke, updating sequentially")
+                row_count = self.update_sequentially(index, iterable, commit)
+            log_update_stats(
+                index, row_count, time.perf_counter() - start, workers_memory
+            )
+        elif language_specific:
+            super().update(index, iterable, commit)
+
+    def remove(self, obj_or_string, commit=True, language_specific=False):
+        if not language_specific and self.connection_alias == "default":
             for lang_code, lang_name in settings.LANGUAGES:
                 lang_code_underscored = lang_code.replace("-", "_")
                 using = f"default_{lang_code_underscored}"
-                translation.activate(lang_code)
                 backend = connections[using].get_backend()
-                backend.update(index, iterable, commit, language_specific=True)
-            translation.activate(current_language)
+                backend.remove(obj_or_string, commit, language_specific=True)
         elif language_specific:
-            super().update(index, iterable, commit)
+            super().remove(obj_or_string, commit)
+
+    def remove_many(self, objs_or_strings, commit=True, language_specific=False):
+        """
+        Removes several documents with one writer and commit per language
+        instead of one per document
+        """
+        if not language_specific and self.connection_alias == "default":
+            for lang_code, lang_name in settings.LANGUAGES:
+                lang_code_underscored = lang_code.replace("-", "_")
+                using = f"default_{lang_code_underscored}"
+                backend = connections[using].get_backend()
+                backend.remove_many(objs_or_strings, commit, language_specific=True)
+        elif language_specific:
+            if not self.setup_complete:
+                self.setup()
+            self.index = self.index.refresh()
+            whoosh_ids = [get_identifier(obj) for obj in objs_or_strings]
+            try:
+                writer = AsyncWriter(self.index)
+                for whoosh_id in whoosh_ids:
+                    writer.delete_by_term(ID, whoosh_id)
+                if commit:
+                    writer.commit()
+            except Exception:
+                if not self.silently_fail:
+                    raise
+                self.log.exception(
+                    "Failed to remove %d documents from Whoosh", len(whoosh_ids)
+                )
+
+    def update_pks(self, index, pks, commit=True):
+        """
+        Updates the objects with the given keys in all languages without
+        loading them here, as the parallel workers load them themselves
+        """
+        if UPDATE_WORKERS == 0:
+            queryset = index.index_queryset(using=self.connection_alias)
+            return self.update(index, queryset.filter(pk__in=pks), commit)
+        start = time.perf_counter()
+        try:
+            row_count, workers_memory = self.update_pks_in_parallel(
+                index, pks, commit
+            )
+        except BrokenProcessPool:
+            discard_process_pool(UPDATE_POOL_NAME)
+            logger.warning("The index update pool broke, updating sequentially")
+            queryset = index.index_queryset(using=self.connection_alias)
+            row_count = self.update_sequentially(
+                index, queryset.filter(pk__in=pks), commit
+            )
+            workers_memory = None
+        log_update_stats(index, row_count, time.perf_counter() - start, workers_memory)
+
+    def update_in_parallel(self, index, iterable, commit=True):
+        # the workers load the batch themselves, so only read the keys
+        if hasattr(iterable, "values_list"):
+            pks = list(iterable.prefetch_related(None).values_list("pk", flat=True))
+        else:
+            pks = [obj.pk for obj in iterable]
+        return self.update_pks_in_parallel(index, pks, commit)
+
+    def update_pks_in_parallel(self, index, pks, commit=True):
+        if not pks:
+            return 0, None
+        model_label = index.get_model()._meta.label
+        pool = get_update_pool()
+        futures = [
+            pool.submit(
+                update_language_index,
+                f"default_{lang_code.replace('-', '_')}",
+                lang_code,
+                model_label,
+                pks,
+                commit,
+            )
+            for lang_code, lang_name in settings.LANGUAGES
+        ]
+        results = [future.result() for future in futures]
+        return len(pks), max(memory for row_count, memory in results)
+
+    def update_sequentially(self, index, iterable, commit=True):
+        # evaluated once, so that the prefetched data serves all languages
+        iterable = list(iterable)
+        current_language = (translation.get_language() or settings.LANGUAGE_CODE)[
+            :2
+        ]
+        for lang_code, lang_name in settings.LANGUAGES:
+            lang_code_underscored = lang_code.replace("-", "_")
+            using = f"default_{lang_code_underscored}"
+            translation.activate(lang_code)
+            backend = connections[using].get_backend()
+            backend.update(index, iterable, commit, language_specific=True)
+        translation.activate(current_language)
+        return len(iterable)
 
 
 class MultilingualWhooshSearchQuery(WhooshSearchQuery):
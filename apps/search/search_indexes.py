@@ -1,5 +1,7 @@
+from django.db import models
 from haystack import indexes
 
+from myproject.apps.categories.models import Category
 from myproject.apps.ideas.models import Idea
 
 
@@ -10,7 +12,19 @@ class IdeaIndex(indexes.SearchIndex, indexes.Indexable):
         return Idea
 
     def index_queryset(self, using=None):
-        return self.get_model().objects.all()
+        # update_index slices this by pk in batches; every batch
+        # prefetches the translations of all languages at once
+        return (
+            self.get_model()
+            .objects.order_by("pk")
+            .prefetch_related(
+                "translations",
+                models.Prefetch(
+                    "categories",
+                    queryset=Category.objects.prefetch_related("translations"),
+                ),
+            )
+        )
 
     def prepare_text(self, idea):
         fields = [idea.translated_title, idea.translated_content]
@@ -0,0 +1,73 @@
+from django.db import models
+from haystack.exceptions import NotHandled
+from haystack.signals import BaseSignalProcessor
+
+from myproject.apps.ideas.models import Idea, IdeaTranslations
+from .models import IndexQueueItem
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Enqueues the changed objects instead of writing the indices inside
+    the request; the process_index_queue command applies them in batches
+    """
+
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+        models.signals.post_save.connect(
+            self.handle_translations_change, sender=IdeaTranslations
+        )
+        models.signals.post_delete.connect(
+            self.handle_translations_change, sender=IdeaTranslations
+        )
+        models.signals.m2m_changed.connect(
+            self.handle_categories_change, sender=Idea.categories.through
+        )
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+        models.signals.post_save.disconnect(
+            self.handle_translations_change, sender=IdeaTranslations
+        )
+        models.signals.post_delete.disconnect(
+            self.handle_translations_change, sender=IdeaTranslations
+        )
+        models.signals.m2m_changed.disconnect(
+            self.handle_categories_change, sender=Idea.categories.through
+        )
+
+    def is_indexed(self, model):
+        try:
+            self.connections["default"].get_unified_index().get_index(model)
+        except NotHandled:
+            return False
+        return True
+
+    def enqueue(self, model, pks, action=IndexQueueItem.UPDATE):
+        from .index_queue import enqueue
+
+        enqueue(model, pks, action)
+
+    def handle_save(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            self.enqueue(sender, [instance.pk])
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if self.is_indexed(sender):
+            self.enqueue(sender, [instance.pk], IndexQueueItem.DELETE)
+
+    def handle_translations_change(self, sender, instance, **kwargs):
+        self.enqueue(Idea, [instance.idea_id])
+
+    def handle_categories_change(self, sender, instance, action, reverse,
+                                 pk_set, **kwargs):
+        if not reverse:
+            if action in ("post_add", "post_remove", "post_clear"):
+                self.enqueue(Idea, [instance.pk])
+        elif action in ("post_add", "post_remove"):
+            self.enqueue(Idea, pk_set)
+        elif action == "pre_clear":
+            # after clearing, the ideas of the category are gone
+            self.enqueue(Idea, instance.category_ideas.values_list("pk", flat=True))
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.sitemaps',
 	"django.forms",
 	"django_json_ld",
     # third-party
@@ -174,10 +175,30 @@ lang_code_underscored = LANGUAGE_CODE.replace("-", "_")
 HAYSTACK_CONNECTIONS["default"] = HAYSTACK_CONNECTIONS[
     f"default_{lang_code_underscored}"
 ]
+HAYSTACK_SIGNAL_PROCESSOR = (
+    "myproject.apps.search.signal_processors.QueuedSignalProcessor"
+)
+
+# shared by the web processes, the worker pools and the management
+# commands
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(BASE_DIR, "tmp", "cache"),
+    }
+}
 
 ELASTICSEARCH_DSL={
 	'default': { 'hosts': 'localhost:9200' },
 	}
+# Set to an id, e.g. "ideas-search", to send only template parameters
+# with each search. Store the template with
+# "python manage.py store_idea_search_template" before enabling it;
+# reindex_ideas stores it again.
+IDEAS_SEARCH_TEMPLATE_ID = None
+ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = (
+    "myproject.apps.ideas.signal_processors.GenerationSignalProcessor"
+)
 
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'myproject', 'site_static'),
@@ -3,8 +3,11 @@ from django.conf.urls.i18n import i18n_patterns
 from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
+from django.contrib.sitemaps.views import sitemap
 from django.shortcuts import redirect
 
+from myproject.apps.ideas.sitemaps import IdeaSitemap
+
 urlpatterns = i18n_patterns(
     path("", lambda request: redirect("ideas:idea_list")),
     path("admin/", admin.site.urls),
@@ -13,5 +16,13 @@ urlpatterns = i18n_patterns(
 	payth("search/", inlcude("haystack.urls")),
 )
 
+urlpatterns += [
+    path(
+        "sitemap.xml",
+        sitemap,
+        {"sitemaps": {"ideas": IdeaSitemap}},
+        name="django.contrib.sitemaps.views.sitemap",
+    ),
+]
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 urlpatterns += static("/media/", document_root=settings.MEDIA_ROOT) 
\ No newline at end of file